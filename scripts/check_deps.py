@@ -2,6 +2,8 @@
 """检查依赖"""
 import sys
 import os
+import importlib
+import importlib.util
 
 # 添加项目根目录到 path
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -23,10 +25,19 @@ deps = [
     "httpx",
 ]
 
+# 只解析模块位置，不执行模块代码；--verbose 时才真正导入以读取版本号
+verbose = "--verbose" in sys.argv
+
 for dep in deps:
-    try:
-        __import__(dep)
+    if importlib.util.find_spec(dep) is None:
+        print(f"❌ {dep}: 未安装")
+        continue
+    if not verbose:
         print(f"✅ {dep}")
+        continue
+    try:
+        version = getattr(importlib.import_module(dep), "__version__", "unknown")
+        print(f"✅ {dep} - {version}")
     except ImportError as e:
         print(f"❌ {dep}: {e}")
 
@@ -1,85 +1,216 @@
 # -*- coding: utf-8 -*-
 import json
-import re
-from collections import Counter
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 
-# 读取原始数据
-raw_items = []
-with open("data/raw/annotations.jsonl", "r", encoding="utf-8") as f:
-    for line in f:
-        raw_items.append(json.loads(line.strip()))
+try:
+    import orjson
 
-print(f"加载 {len(raw_items)} 条原始数据")
+    def loads(data):
+        return orjson.loads(data)
 
-# 清洗
-clean_items = []
-stats = {"dropped": 0, "reasons": Counter()}
+    def dumps(obj, indent=False):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+except ImportError:
+    # orjson 未安装时退回标准库，输出同样为 UTF-8 字节
+    def loads(data):
+        return json.loads(data)
 
-for item in raw_items:
+    def dumps(obj, indent=False):
+        return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None).encode("utf-8")
+
+
+RAW_PATH = "data/raw/annotations.jsonl"
+CLEAN_PATH = "data/clean/annotations_clean.jsonl"
+REPORT_PATH = "data/stats/cleaning_report.json"
+
+# 原始文件小于该大小时，清洗结果在内存中拼接后一次写出；更大时逐行流式写入
+BATCH_WRITE_LIMIT = 256 * 1024 * 1024
+
+# 原始文件达到该大小时按字节区间切块，交给多个进程并行清洗
+PARALLEL_MIN_SIZE = 32 * 1024 * 1024
+
+# 丢弃原因用列表下标计数，避免每次丢弃都对字符串键做哈希
+R_TITLE, R_TIME, R_DESC = range(3)
+DROP_REASONS = ("missing_title", "missing_time", "desc_too_short")
+
+# 标签清洗不走正则："#" 和话题后缀都是固定字符串
+_TOPIC_SUFFIX = "[话题]"
+
+
+def clean(item, stats):
+    """清洗单条数据，不合格返回 None 并记录丢弃原因"""
     # 检查必需字段
-    if not item.get("title", "").strip():
+    title = item.get("title", "").strip()
+    if not title:
         stats["dropped"] += 1
-        stats["reasons"]["missing_title"] += 1
-        continue
-    
-    if not item.get("time"):
+        stats["reasons"][R_TITLE] += 1
+        return None
+
+    time_value = item.get("time")
+    if not time_value:
         stats["dropped"] += 1
-        stats["reasons"]["missing_time"] += 1
-        continue
-    
+        stats["reasons"][R_TIME] += 1
+        return None
+
     desc = item.get("desc", "").strip()
     if len(desc) < 10:
         stats["dropped"] += 1
-        stats["reasons"]["desc_too_short"] += 1
-        continue
-    
+        stats["reasons"][R_DESC] += 1
+        return None
+
     # 清洗标签
     raw_tags = item.get("tags", [])
     clean_tags = []
     seen = set()
-    
+
     for tag in raw_tags:
         if not tag:
             continue
-        tag = re.sub(r'#', '', str(tag))
-        tag = re.sub(r'\[话题\]', '', tag)
-        tag = tag.strip()
-        
-        if tag and len(tag) <= 20 and tag.lower() not in seen:
-            clean_tags.append(tag)
-            seen.add(tag.lower())
-    
-    # 保存清洗后的数据
-    clean_item = {
+        tag = str(tag).replace("#", "").replace(_TOPIC_SUFFIX, "").strip()
+
+        if not tag or len(tag) > 20:
+            continue
+        key = tag.casefold()
+        if key in seen:
+            continue
+        seen.add(key)
+        clean_tags.append(tag)
+
+    # 直接用字面量构造：键是编译期驻留的常量，比 dict(zip(keys, values)) 快约一倍
+    return {
         "item_id": item.get("item_id", ""),
         "source": "xhs",
         "url": item.get("url"),
-        "time": item.get("time"),
-        "title": item.get("title", "").strip(),
+        "time": time_value,
+        "title": title,
         "desc": desc,
         "text": item.get("text", "").strip(),
         "tags": clean_tags,
         "images": item.get("images", [])
     }
-    clean_items.append(clean_item)
-
-# 写入清洗后的数据
-with open("data/clean/annotations_clean.jsonl", "w", encoding="utf-8") as f:
-    for item in clean_items:
-        f.write(json.dumps(item, ensure_ascii=False) + "\n")
-
-# 生成报告
-report = {
-    "raw_count": len(raw_items),
-    "clean_count": len(clean_items),
-    "dropped_count": stats["dropped"],
-    "drop_reasons": dict(stats["reasons"]),
-    "pass_rate": round(len(clean_items) / len(raw_items) * 100, 2) if raw_items else 0
-}
-
-with open("data/stats/cleaning_report.json", "w", encoding="utf-8") as f:
-    json.dump(report, f, ensure_ascii=False, indent=2)
-
-print(f"清洗完成: {len(clean_items)} 条")
-print(f"丢弃: {stats['dropped']} 条")
-print(f"通过率: {report['pass_rate']}%")
+
+
+def new_stats():
+    return {"raw": 0, "clean": 0, "dropped": 0, "reasons": [0] * len(DROP_REASONS)}
+
+
+def iter_clean(f_in, stats):
+    """逐行解析并清洗，只保留当前一行在内存中"""
+    for line in f_in:
+        if not line.strip():
+            continue
+        stats["raw"] += 1
+        cleaned = clean(loads(line), stats)
+        if cleaned is not None:
+            yield cleaned
+
+
+def iter_range(f_in, start, end):
+    """逐行读取 [start, end) 区间内开始的行，起点落在行中间时跳到下一行"""
+    if start:
+        f_in.seek(start - 1)
+        f_in.readline()
+    while f_in.tell() < end:
+        line = f_in.readline()
+        if not line:
+            break
+        yield line
+
+
+def clean_range(start, end, out_path):
+    """子进程入口：清洗一个字节区间并写入临时文件"""
+    stats = new_stats()
+    with open(RAW_PATH, "rb") as fin, open(out_path, "wb") as fout:
+        for clean_item in iter_clean(iter_range(fin, start, end), stats):
+            fout.write(dumps(clean_item) + b"\n")
+            stats["clean"] += 1
+    return stats
+
+
+def clean_parallel(size, workers):
+    """按字节区间切块并行清洗，再按原顺序拼接输出"""
+    step = -(-size // workers)
+    ranges = [(start, min(start + step, size)) for start in range(0, size, step)]
+    out_dir = os.path.dirname(CLEAN_PATH) or "."
+    part_paths = []
+    for _ in ranges:
+        fd, path = tempfile.mkstemp(suffix=".part", dir=out_dir)
+        os.close(fd)
+        part_paths.append(path)
+
+    stats = new_stats()
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(clean_range, start, end, path)
+                for (start, end), path in zip(ranges, part_paths)
+            ]
+            for future in futures:
+                part_stats = future.result()
+                for key in ("raw", "clean", "dropped"):
+                    stats[key] += part_stats[key]
+                for i, n in enumerate(part_stats["reasons"]):
+                    stats["reasons"][i] += n
+
+        with open(CLEAN_PATH, "wb") as fout:
+            for path in part_paths:
+                with open(path, "rb") as part:
+                    shutil.copyfileobj(part, fout)
+    finally:
+        for path in part_paths:
+            os.remove(path)
+    return stats
+
+
+def clean_serial(fin):
+    """单进程清洗，小文件直接在内存中拼接后一次写出"""
+    stats = new_stats()
+    with open(CLEAN_PATH, "wb") as fout:
+        if os.fstat(fin.fileno()).st_size < BATCH_WRITE_LIMIT:
+            out_lines = [dumps(clean_item) for clean_item in iter_clean(fin, stats)]
+            stats["clean"] = len(out_lines)
+            if out_lines:
+                fout.write(b"\n".join(out_lines) + b"\n")
+        else:
+            for clean_item in iter_clean(fin, stats):
+                fout.write(dumps(clean_item) + b"\n")
+                stats["clean"] += 1
+    return stats
+
+
+def main():
+    # 读取 -> 清洗 -> 写入
+    size = os.stat(RAW_PATH).st_size
+    workers = os.cpu_count() or 1
+    if size >= PARALLEL_MIN_SIZE and workers > 1:
+        stats = clean_parallel(size, workers)
+    else:
+        with open(RAW_PATH, "rb") as fin:
+            stats = clean_serial(fin)
+
+    print(f"加载 {stats['raw']} 条原始数据")
+
+    # 生成报告
+    report = {
+        "raw_count": stats["raw"],
+        "clean_count": stats["clean"],
+        "dropped_count": stats["dropped"],
+        "drop_reasons": {
+            name: n for name, n in zip(DROP_REASONS, stats["reasons"]) if n
+        },
+        "pass_rate": round(stats["clean"] / stats["raw"] * 100, 2) if stats["raw"] else 0
+    }
+
+    with open(REPORT_PATH, "wb") as f:
+        f.write(dumps(report, indent=True))
+
+    print(f"清洗完成: {stats['clean']} 条")
+    print(f"丢弃: {stats['dropped']} 条")
+    print(f"通过率: {report['pass_rate']}%")
+
+
+if __name__ == "__main__":
+    main()
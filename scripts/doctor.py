@@ -9,8 +9,34 @@ Environment Doctor - 环境自检脚本
 """
 import sys
 import os
+import importlib.util
+from importlib.metadata import distributions
 from pathlib import Path
 
+# 从项目根目录导入 src 包（直接以 python scripts/doctor.py 运行时）
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.utils.lines import count_lines
+
+
+def has_module(module_name):
+    """只定位模块而不执行其顶层代码"""
+    try:
+        return importlib.util.find_spec(module_name) is not None
+    except (ImportError, ValueError):
+        # 父包不存在时 find_spec 会抛出 ModuleNotFoundError
+        return False
+
+
+def installed_distributions():
+    """一次遍历 site-packages 元数据，返回 {分发包名: 版本}，不执行任何模块代码"""
+    installed = {}
+    for dist in distributions():
+        name = dist.metadata["Name"]
+        if name:
+            installed[name.lower().replace("_", "-")] = dist.version
+    return installed
+
 
 def main():
     print("=" * 70)
@@ -76,29 +102,28 @@ def main():
     # === 4. 关键依赖检查 ===
     print("\n🔧 关键依赖检查:")
     
+    # (模块名, 分发包名, 说明)
     critical_deps = [
-        ("streamlit", "Streamlit Dashboard"),
-        ("google.protobuf", "Protobuf (streamlit 依赖)"),
-        ("networkx", "图谱构建"),
-        ("pyvis", "图谱可视化"),
-        ("scipy", "图谱算法"),
-        ("pandas", "数据处理"),
+        ("streamlit", "streamlit", "Streamlit Dashboard"),
+        ("google.protobuf", "protobuf", "Protobuf (streamlit 依赖)"),
+        ("networkx", "networkx", "图谱构建"),
+        ("pyvis", "pyvis", "图谱可视化"),
+        ("scipy", "scipy", "图谱算法"),
+        ("pandas", "pandas", "数据处理"),
     ]
     
+    installed = installed_distributions()
     missing = []
-    for module_name, desc in critical_deps:
-        try:
-            # 特殊处理 google.protobuf
-            if module_name == "google.protobuf":
-                __import__("google.protobuf")
-            else:
-                mod = __import__(module_name)
-            
-            version = getattr(mod, "__version__", "unknown")
-            print(f"  ✅ {desc:30s} ({module_name}) - {version}")
-        except ImportError:
-            print(f"  ❌ {desc:30s} ({module_name}) - 未安装")
-            missing.append(module_name)
+    for module_name, dist_name, desc in critical_deps:
+        version = installed.get(dist_name)
+        if version is None:
+            # 没有元数据时退回 find_spec 定位模块
+            if not has_module(module_name):
+                print(f"  ❌ {desc:30s} ({module_name}) - 未安装")
+                missing.append(dist_name)
+                continue
+            version = "unknown"
+        print(f"  ✅ {desc:30s} ({module_name}) - {version}")
     
     # === 5. 数据文件检查 ===
     print("\n📄 数据文件检查:")
@@ -110,15 +135,13 @@ def main():
     ]
     
     for path, desc in data_files:
-        if os.path.exists(path):
-            try:
-                with open(path, "r", encoding="utf-8") as f:
-                    count = sum(1 for _ in f)
-                print(f"  ✅ {desc:20s} - {count} 条")
-            except:
-                print(f"  ⚠️  {desc:20s} - 存在但无法读取")
-        else:
+        try:
+            count = count_lines(path)
+            print(f"  ✅ {desc:20s} - {count} 条")
+        except FileNotFoundError:
             print(f"  ❌ {desc:20s} - 不存在")
+        except OSError:
+            print(f"  ⚠️  {desc:20s} - 存在但无法读取")
     
     # === 6. 总结与修复建议 ===
     print("\n" + "=" * 70)
@@ -134,15 +157,7 @@ def main():
         print("❌ 发现缺失依赖")
         print("\n🔧 一键修复命令:")
         
-        # 根据包名映射到安装包名
-        install_names = []
-        for mod in missing:
-            if mod == "google.protobuf":
-                install_names.append("protobuf")
-            else:
-                install_names.append(mod)
-        
-        print(f"\n  uv pip install {' '.join(install_names)}")
+        print(f"\n  uv pip install {' '.join(missing)}")
         print("\n或安装完整依赖:")
         print("\n  uv pip install -r requirements.txt")
     
@@ -11,6 +11,13 @@ Smoke Test - 冒烟测试
 import os
 import json
 import sys
+import importlib
+import importlib.util
+
+# 从项目根目录导入 src 包（直接以 python scripts/smoke_test.py 运行时）
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.lines import count_lines
 
 
 def test_data_files():
@@ -28,7 +35,9 @@ def test_data_files():
     total = len(checks)
     
     for path, min_lines in checks.items():
-        if not os.path.exists(path):
+        try:
+            os.stat(path)
+        except FileNotFoundError:
             print(f"  ❌ {path} - 不存在")
             continue
         
@@ -38,8 +47,7 @@ def test_data_files():
             continue
         
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                lines = sum(1 for _ in f)
+            lines = count_lines(path)
             
             if lines >= min_lines:
                 print(f"  ✅ {path} - {lines} 条（要求 ≥{min_lines}）")
@@ -64,11 +72,12 @@ def test_output_files():
     total = len(checks)
     
     for path, min_size in checks.items():
-        if not os.path.exists(path):
+        try:
+            size = os.stat(path).st_size
+        except FileNotFoundError:
             print(f"  ⚠️  {path} - 不存在（需先运行 Mine）")
             continue
         
-        size = os.path.getsize(path)
         size_kb = size / 1024
         
         if size >= min_size:
@@ -126,14 +135,27 @@ def test_dependencies():
     passed = 0
     total = len(deps)
     
+    verbose = "--verbose" in sys.argv
+
     for dep in deps:
         try:
-            mod = __import__(dep.replace(".", "_") if "." in dep else dep)
-            version = getattr(mod, "__version__", "unknown")
-            print(f"  ✅ {dep:20s} - {version}")
-            passed += 1
+            found = importlib.util.find_spec(dep) is not None
         except ImportError:
+            found = False
+        if not found:
             print(f"  ❌ {dep:20s} - 未安装")
+            continue
+
+        # 只有 --verbose 时才导入模块读取版本号
+        version = "已安装"
+        if verbose:
+            try:
+                version = getattr(importlib.import_module(dep), "__version__", "unknown")
+            except ImportError:
+                print(f"  ❌ {dep:20s} - 导入失败")
+                continue
+        print(f"  ✅ {dep:20s} - {version}")
+        passed += 1
     
     return passed, total
 
@@ -15,6 +15,11 @@ import os
 import sys
 import io
 
+try:
+    import orjson as _json
+except ImportError:
+    _json = json
+
 # 修复 Windows 终端编码问题
 if sys.platform == "win32":
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
@@ -68,41 +73,41 @@ async def main():
         print("=" * 60)
         print()
         
+        # 只打开一次输出文件，读出前 2 条同时用于预览和 schema 验证
+        with open(output_file, "rb") as f:
+            preview_items = [_json.loads(line) for line in (f.readline(), f.readline()) if line]
+        if not preview_items:
+            raise ValueError(f"输出文件为空: {output_file}")
+        
         # 显示预览
         if count > 0:
             print("📋 数据预览（前 2 条）:")
             print("-" * 60)
-            with open(output_file, "r", encoding="utf-8") as f:
-                for i, line in enumerate(f):
-                    if i >= 2:  # 只显示前 2 条
-                        break
-                    
-                    item = json.loads(line)
-                    title = item.get("title", "无标题")
-                    desc = item.get("desc", "")
-                    tags = item.get("tags", [])
-                    images = item.get("images", [])
-                    time_str = item.get("time", "未知时间")
-                    
-                    print(f"\n[笔记 {i+1}]")
-                    print(f"  标题: {title[:50]}{'...' if len(title) > 50 else ''}")
-                    print(f"  描述: {desc[:60]}{'...' if len(desc) > 60 else ''}")
-                    print(f"  标签: {tags[:5]}")  # 最多显示 5 个标签
-                    print(f"  图片数: {len(images)}")
-                    print(f"  时间: {time_str}")
+            for i, item in enumerate(preview_items):
+                title = item.get("title", "无标题")
+                desc = item.get("desc", "")
+                tags = item.get("tags", [])
+                images = item.get("images", [])
+                time_str = item.get("time", "未知时间")
+                
+                print(f"\n[笔记 {i+1}]")
+                print(f"  标题: {title[:50]}{'...' if len(title) > 50 else ''}")
+                print(f"  描述: {desc[:60]}{'...' if len(desc) > 60 else ''}")
+                print(f"  标签: {tags[:5]}")  # 最多显示 5 个标签
+                print(f"  图片数: {len(images)}")
+                print(f"  时间: {time_str}")
             print()
         
         # 验证 schema
         print("🔍 Schema 验证:")
         print("-" * 60)
-        with open(output_file, "r", encoding="utf-8") as f:
-            first_item = json.loads(f.readline())
-            required_fields = ["item_id", "source", "url", "time", "title", "desc", "tags", "images"]
-            
-            for field in required_fields:
-                value = first_item.get(field)
-                status = "✓" if field in first_item else "✗"
-                print(f"  {status} {field}: {type(value).__name__}")
+        first_item = preview_items[0]
+        required_fields = ["item_id", "source", "url", "time", "title", "desc", "tags", "images"]
+        
+        for field in required_fields:
+            value = first_item.get(field)
+            status = "✓" if field in first_item else "✗"
+            print(f"  {status} {field}: {type(value).__name__}")
         print()
         
         print("=" * 60)
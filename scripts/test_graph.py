@@ -4,25 +4,32 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from src.graph.builder import TagCooccurrenceGraph
-from src.graph.analytics import GraphAnalytics  
-from src.graph.visualizer import GraphVisualizer
 
-# 构建图
-print("=" * 60)
-print("测试图谱生成")
-print("=" * 60)
+def main():
+    # 图谱模块会引入 networkx / scipy / pyvis，推迟到真正运行时再导入
+    from src.graph.builder import TagCooccurrenceGraph
+    from src.graph.analytics import GraphAnalytics
+    from src.graph.visualizer import GraphVisualizer
 
-builder = TagCooccurrenceGraph()
-graph = builder.build_graph()
+    # 构建图
+    print("=" * 60)
+    print("测试图谱生成")
+    print("=" * 60)
 
-# 计算 PageRank
-analytics = GraphAnalytics(graph)
-pagerank_top = analytics.compute_pagerank(top_n=15)
-pagerank_dict = dict(pagerank_top)
+    builder = TagCooccurrenceGraph()
+    graph = builder.build_graph()
 
-# 生成可视化
-visualizer = GraphVisualizer(graph, pagerank_dict)
-output_path = visualizer.create_interactive_html()
+    # 计算 PageRank
+    analytics = GraphAnalytics(graph)
+    pagerank_top = analytics.compute_pagerank(top_n=15, verbose=True)
+    pagerank_dict = dict(pagerank_top)
 
-print(f"\n✅ 成功！图谱已生成: {output_path}")
+    # 生成可视化
+    visualizer = GraphVisualizer(graph, pagerank_dict)
+    output_path = visualizer.create_interactive_html()
+
+    print(f"\n✅ 成功！图谱已生成: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,12 @@
 """
 import sys
 import os
+import json
+
+try:
+    import orjson as _json
+except ImportError:
+    _json = json
 
 # 添加项目根目录到 path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -61,7 +67,7 @@ def test_llm(api_key: str):
             print(f"   状态码: {response.status_code}")
             
             if response.status_code == 200:
-                result = response.json()
+                result = _json.loads(response.content)
                 content = result["choices"][0]["message"]["content"]
                 print(f"   ✅ API 调用成功!")
                 print(f"   回复: {content}")
@@ -10,9 +10,69 @@ Insights Panel - 洞察与建议面板
 - A4: 可信度提示（Data quality）
 - A5: 图例说明（How to read）
 """
+import heapq
 import networkx as nx
+import numpy as np
+from functools import lru_cache
+from itertools import islice
 from typing import List, Tuple, Dict
 
+from src.utils.topk import top_k_indices
+
+
+def _graph_fingerprint(graph: nx.Graph) -> Tuple[frozenset, tuple]:
+    """生成图的可哈希指纹（节点集合 + 排序后的带权边），用作社区检测缓存键"""
+    edges = tuple(sorted(
+        (u, v, d.get("weight", 1)) if u <= v else (v, u, d.get("weight", 1))
+        for u, v, d in graph.edges(data=True)
+    ))
+    return frozenset(graph.nodes), edges
+
+
+@lru_cache(maxsize=8)
+def _louvain_communities(nodes: frozenset, edges: tuple) -> Tuple[frozenset, ...]:
+    """
+    按图指纹缓存 Louvain 结果，Streamlit 重跑时同一张图不再重复计算
+    
+    Args:
+        nodes: 节点集合
+        edges: ((u, v, weight), ...)
+        
+    Returns:
+        社区元组，每个社区为标签集合
+    """
+    graph = nx.Graph()
+    graph.add_nodes_from(nodes)
+    graph.add_weighted_edges_from(edges)
+    
+    import networkx.algorithms.community as nx_comm
+    
+    return tuple(
+        frozenset(comm)
+        for comm in nx_comm.louvain_communities(graph, weight="weight")
+    )
+
+
+def _pagerank_to_arrays(pagerank_top: List[Tuple[str, float]]) -> Tuple[np.ndarray, np.ndarray]:
+    """把 [(tag, score), ...] 一次性转换为 (tags, scores) 两个并列数组"""
+    tags = np.empty(len(pagerank_top), dtype=object)
+    tags[:] = [tag for tag, _ in pagerank_top]
+    scores = np.fromiter((score for _, score in pagerank_top), dtype=np.float64, count=len(pagerank_top))
+    return tags, scores
+
+
+def _rising_to_arrays(rising_edges: List[Tuple[str, str, float, dict]]) -> Tuple[np.ndarray, ...]:
+    """把 [(tag1, tag2, delta, meta), ...] 一次性转换为 (tag1s, tag2s, deltas, metas) 四个并列数组"""
+    n = len(rising_edges)
+    tag1s = np.empty(n, dtype=object)
+    tag2s = np.empty(n, dtype=object)
+    metas = np.empty(n, dtype=object)
+    tag1s[:] = [edge[0] for edge in rising_edges]
+    tag2s[:] = [edge[1] for edge in rising_edges]
+    metas[:] = [edge[3] for edge in rising_edges]
+    deltas = np.fromiter((edge[2] for edge in rising_edges), dtype=np.float64, count=n)
+    return tag1s, tag2s, deltas, metas
+
 
 class InsightsGenerator:
     """洞察生成器"""
@@ -20,10 +80,12 @@ class InsightsGenerator:
     def __init__(
         self,
         graph: nx.Graph,
-        pagerank_top: List[Tuple[str, float]],
-        rising_edges: List[Tuple[str, str, float, dict]],
-        window_stats: Dict,
-        keyword: str = "AI工具"
+        pagerank_top: List[Tuple[str, float]] = None,
+        rising_edges: List[Tuple[str, str, float, dict]] = None,
+        window_stats: Dict = None,
+        keyword: str = "AI工具",
+        pagerank_arrays: Tuple[np.ndarray, np.ndarray] = None,
+        rising_arrays: Tuple[np.ndarray, ...] = None
     ):
         """
         Args:
@@ -32,12 +94,34 @@ class InsightsGenerator:
             rising_edges: Rising Edges 列表
             window_stats: 窗口统计信息
             keyword: 关键词
+            pagerank_arrays: (tags, scores) 并列数组，提供时忽略 pagerank_top
+            rising_arrays: (tag1s, tag2s, deltas, metas) 并列数组，提供时忽略 rising_edges
         """
         self.graph = graph
-        self.pagerank_top = pagerank_top
-        self.rising_edges = rising_edges
-        self.window_stats = window_stats
+        self.window_stats = window_stats or {}
         self.keyword = keyword
+        
+        # 内部统一使用并列数组；旧的元组列表接口在这里一次性转换
+        if pagerank_arrays is None:
+            pagerank_arrays = _pagerank_to_arrays(pagerank_top or [])
+        if rising_arrays is None:
+            rising_arrays = _rising_to_arrays(rising_edges or [])
+        self._pr_tags, self._pr_scores = pagerank_arrays
+        self._rising_tag1s, self._rising_tag2s, self._rising_deltas, self._rising_metas = rising_arrays
+        self._pr_count = len(self._pr_scores)
+        self._rising_count = len(self._rising_deltas)
+        self._pagerank_dict = dict(zip(self._pr_tags.tolist(), self._pr_scores.tolist()))
+        
+        # 摘要和建议只用到 PageRank 前 5 和趋势边前 3，一次性选出，不依赖上游是否已排序
+        pr_idx = top_k_indices(self._pr_scores, 5)
+        self._pr_sorted = list(zip(self._pr_tags[pr_idx].tolist(), self._pr_scores[pr_idx].tolist()))
+        rising_idx = top_k_indices(self._rising_deltas, 3)
+        self._rising_sorted = list(zip(
+            self._rising_tag1s[rising_idx].tolist(),
+            self._rising_tag2s[rising_idx].tolist(),
+            self._rising_deltas[rising_idx].tolist(),
+            self._rising_metas[rising_idx].tolist()
+        ))
     
     def generate_summary(self) -> str:
         """
@@ -46,23 +130,23 @@ class InsightsGenerator:
         Returns:
             summary: 一句话结论文本
         """
-        if not self.pagerank_top:
+        if not self._pr_count:
             return f"【{self.keyword}】的内容分析数据不足。"
         
         # 中心标签（PageRank Top 1）
-        center_tag = self.pagerank_top[0][0]
+        center_tag = self._pr_sorted[0][0]
         
         # 子话题（Top 2-4 标签）
-        subtopics = [tag for tag, _ in self.pagerank_top[1:4]]
+        subtopics = [tag for tag, _ in self._pr_sorted[1:4]]
         subtopics_str = "、".join(subtopics) if subtopics else "多个方向"
         
         # Rising/Top 组合
         mode = self.window_stats.get("mode", "rising")
         
-        if mode == "fallback" or not self.rising_edges:
+        if mode == "fallback" or not self._rising_count:
             # Fallback 模式
-            if self.rising_edges:
-                top_combos = [f"{t1}×{t2}" for t1, t2, _, _ in self.rising_edges[:3]]
+            if self._rising_count:
+                top_combos = [f"{t1}×{t2}" for t1, t2, _, _ in self._rising_sorted]
                 combo_str = "、".join(top_combos)
                 summary = (
                     f"【{self.keyword}】的内容核心围绕**{center_tag}**，"
@@ -76,7 +160,7 @@ class InsightsGenerator:
                 )
         else:
             # Rising 模式
-            rising_combos = [f"{t1}×{t2}" for t1, t2, _, _ in self.rising_edges[:3]]
+            rising_combos = [f"{t1}×{t2}" for t1, t2, _, _ in self._rising_sorted]
             combo_str = "、".join(rising_combos) if rising_combos else "暂无明显趋势"
             summary = (
                 f"【{self.keyword}】的内容核心围绕**{center_tag}**，"
@@ -97,30 +181,30 @@ class InsightsGenerator:
             [{'id': 1, 'tags': [...], 'size': N}, ...]
         """
         try:
-            import networkx.algorithms.community as nx_comm
-            communities = nx_comm.louvain_communities(self.graph, weight="weight")
-            
-            # 按社区大小排序
-            communities_sorted = sorted(communities, key=len, reverse=True)
+            n = self.graph.number_of_nodes()
+            m = self.graph.number_of_edges()
+            if n <= top_k or m < 2 * top_k:
+                # 图太小，模块度优化没有意义：直接把每个连通分量当作一个社区
+                communities = tuple(nx.connected_components(self.graph))
+            else:
+                communities = _louvain_communities(*_graph_fingerprint(self.graph))
             
-            # 取 Top K
+            # 按社区大小取 Top K（部分选择，同大小保持原顺序，与完整排序后切片一致）
             result = []
-            for i, comm in enumerate(communities_sorted[:top_k], 1):
-                # 获取社区内标签的 PageRank 排序
-                comm_tags = list(comm)
-                
-                # 如果有 PageRank，按 PageRank 排序
-                pagerank_dict = dict(self.pagerank_top)
-                comm_tags_sorted = sorted(
-                    comm_tags,
-                    key=lambda t: pagerank_dict.get(t, 0),
-                    reverse=True
-                )
+            for i, comm in enumerate(heapq.nlargest(top_k, communities, key=len), 1):
+                # 只对有 PageRank 分数的标签做部分选择，其余标签按原顺序补在末尾
+                pagerank_dict = self._pagerank_dict
+                ranked = [t for t in comm if t in pagerank_dict]
+                comm_tags_sorted = heapq.nlargest(5, ranked, key=pagerank_dict.__getitem__)
+                if len(comm_tags_sorted) < 5:
+                    comm_tags_sorted.extend(
+                        islice((t for t in comm if t not in pagerank_dict), 5 - len(comm_tags_sorted))
+                    )
                 
                 result.append({
                     "id": i,
-                    "tags": comm_tags_sorted[:5],  # 每个社区取前5个代表标签
-                    "size": len(comm_tags)
+                    "tags": comm_tags_sorted,  # 每个社区取前5个代表标签
+                    "size": len(comm)
                 })
             
             return result
@@ -139,24 +223,24 @@ class InsightsGenerator:
         suggestions = []
         
         # === 选题建议（2条）===
-        if self.rising_edges and len(self.rising_edges) >= 2:
-            tag1_a, tag1_b, _, _ = self.rising_edges[0]
+        if self._rising_count >= 2:
+            tag1_a, tag1_b, _, _ = self._rising_sorted[0]
             suggestions.append({
                 "type": "选题",
                 "suggestion": f"结合「{tag1_a}」和「{tag1_b}」的对比测评"
             })
             
-            if len(self.rising_edges) >= 2:
-                tag2_a, tag2_b, _, _ = self.rising_edges[1]
+            if self._rising_count >= 2:
+                tag2_a, tag2_b, _, _ = self._rising_sorted[1]
                 suggestions.append({
                     "type": "选题",
                     "suggestion": f"围绕「{tag2_a}」和「{tag2_b}」的组合教程"
                 })
         else:
             # Fallback
-            if self.pagerank_top and len(self.pagerank_top) >= 3:
-                tag1 = self.pagerank_top[0][0]
-                tag2 = self.pagerank_top[1][0]
+            if self._pr_count >= 3:
+                tag1 = self._pr_sorted[0][0]
+                tag2 = self._pr_sorted[1][0]
                 suggestions.append({
                     "type": "选题",
                     "suggestion": f"聚焦「{tag1}」的深度解析"
@@ -177,9 +261,9 @@ class InsightsGenerator:
         })
         
         # === 标签建议（1条）===
-        if self.pagerank_top and len(self.pagerank_top) >= 5:
-            main_tag = self.pagerank_top[0][0]
-            aux_tags = [tag for tag, _ in self.pagerank_top[1:5]]
+        if self._pr_count >= 5:
+            main_tag = self._pr_sorted[0][0]
+            aux_tags = [tag for tag, _ in self._pr_sorted[1:5]]
             suggestions.append({
                 "type": "标签",
                 "suggestion": f"主标签「{main_tag}」+ 辅助标签「{aux_tags[0]}、{aux_tags[1]}、{aux_tags[2]}」"
@@ -191,8 +275,8 @@ class InsightsGenerator:
             })
         
         # === 标题建议（1条）===
-        if self.pagerank_top:
-            top_tag = self.pagerank_top[0][0]
+        if self._pr_count:
+            top_tag = self._pr_sorted[0][0]
             suggestions.append({
                 "type": "标题",
                 "suggestion": f"标题公式：N个{top_tag} + 实测/避坑/必备 + 收藏"
@@ -252,12 +336,42 @@ class InsightsGenerator:
         }
 
 
-def render_insights_panel(
+def build_insights_content(
     graph: nx.Graph,
     pagerank_top: List[Tuple[str, float]],
     rising_edges: List,
     window_stats: Dict,
     keyword: str = "AI工具"
+) -> Dict:
+    """
+    生成洞察面板内容（纯数据，可由调用方缓存）
+    
+    Args:
+        graph: NetworkX 图
+        pagerank_top: PageRank Top 列表
+        rising_edges: Rising Edges 列表
+        window_stats: 窗口统计
+        keyword: 关键词
+        
+    Returns:
+        {"summary", "communities", "suggestions", "quality"}
+    """
+    generator = InsightsGenerator(graph, pagerank_top, rising_edges, window_stats, keyword)
+    return {
+        "summary": generator.generate_summary(),
+        "communities": generator.detect_communities(top_k=3),
+        "suggestions": generator.generate_creation_suggestions(),
+        "quality": generator.get_data_quality_info()
+    }
+
+
+def render_insights_panel(
+    graph: nx.Graph,
+    pagerank_top: List[Tuple[str, float]],
+    rising_edges: List,
+    window_stats: Dict,
+    keyword: str = "AI工具",
+    content: Dict = None
 ):
     """
     渲染洞察面板（在 Streamlit 中调用）
@@ -268,19 +382,21 @@ def render_insights_panel(
         rising_edges: Rising Edges 列表
         window_stats: 窗口统计
         keyword: 关键词
+        content: 已生成的面板内容（可选，见 build_insights_content；缺省时现场生成）
     """
     import streamlit as st
     
-    generator = InsightsGenerator(graph, pagerank_top, rising_edges, window_stats, keyword)
+    if content is None:
+        content = build_insights_content(graph, pagerank_top, rising_edges, window_stats, keyword)
     
     # === A1: 一句话结论 ===
     st.markdown("### 💡 核心洞察")
-    summary = generator.generate_summary()
+    summary = content["summary"]
     st.info(summary)
     
     # === A2: 热点结构 ===
     with st.expander("📊 热点结构分析", expanded=False):
-        communities = generator.detect_communities(top_k=3)
+        communities = content["communities"]
         
         if communities:
             st.markdown("**Top 3 话题社区：**")
@@ -293,7 +409,7 @@ def render_insights_panel(
     # === A3: 创作建议 ===
     st.markdown("### ✨ 创作建议（可直接使用）")
     
-    suggestions = generator.generate_creation_suggestions()
+    suggestions = content["suggestions"]
     
     # 按类型分组显示
     col1, col2 = st.columns(2)
@@ -321,7 +437,7 @@ def render_insights_panel(
                 st.markdown(f"- {sug['suggestion']}")
     
     # === A4: 可信度提示 ===
-    quality_info = generator.get_data_quality_info()
+    quality_info = content["quality"]
     
     with st.expander("🔍 数据质量说明", expanded=False):
         col1, col2, col3 = st.columns(3)
@@ -14,22 +14,29 @@ AI Tools 数据挖掘工作站
 - 一键导出提交包
 """
 import streamlit as st
-import json
+import pandas as pd
+import importlib
+import io
 import os
+import subprocess
 import sys
 import shutil
+import threading
+import traceback
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
+from operator import itemgetter
 
 # 添加项目根目录到路径
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
-from src.graph.builder import TagCooccurrenceGraph
-from src.graph.analytics import GraphAnalytics
-from src.graph.visualizer import GraphVisualizer
 from src.utils.packaging import create_submission_package, deduplicate_jsonl, merge_jsonl_files
-from src.app.components.insights import render_insights_panel
+from src.utils import jsonl as fast_json
+from src.utils.lines import count_lines as count_lines_in_file
 
 # 模板引擎延迟导入（兜底机制，避免新模块拖挂现有功能）
 try:
@@ -81,11 +88,15 @@ for key, default in {
     "rising_edges": [],
     "window_stats": {},
     "graph_obj": None,
+    "graph_key": None,
     "graph_path": None,
     "graph_nodes": 0,
     "graph_edges": 0,
+    "pr_scores": None,
+    "pr_df": None,
+    "rising_df": None,
     "items": [],
-    "logs": [],
+    "logs": deque(maxlen=10),  # 只显示最近 10 条，超出自动丢弃最旧的
     "mine_done": False,
     "generated_drafts": [],
     "trigger_crawl": False,
@@ -103,33 +114,115 @@ st.markdown("---")
 
 # ============= 辅助函数 =============
 
+@st.cache_resource(show_spinner=False)
+def _mine_deps():
+    """
+    按需导入图谱模块（会拉起 NetworkX / SciPy / PyVis），首次 Mine 时才加载
+    
+    Returns:
+        (TagCooccurrenceGraph, GraphAnalytics, GraphVisualizer)
+    """
+    builder = importlib.import_module("src.graph.builder")
+    analytics = importlib.import_module("src.graph.analytics")
+    visualizer = importlib.import_module("src.graph.visualizer")
+    return builder.TagCooccurrenceGraph, analytics.GraphAnalytics, visualizer.GraphVisualizer
+
+
+# 挖掘各阶段按数据文件 (路径, 修改时间, 大小) 缓存：数据不变时再次 Mine 直接复用结果
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _mine_graph(data_path, mtime_ns, size):
+    """构建标签共现图（图对象在多次重跑间共享，调用方不可原地修改）"""
+    TagCooccurrenceGraph, _, _ = _mine_deps()
+    builder = TagCooccurrenceGraph(data_path)
+    builder.items = _load_jsonl_cached(data_path, mtime_ns, size)
+    return builder.build_graph()
+
+
+@st.cache_data(show_spinner=False, ttl=24 * 3600)
+def _mine_pagerank(data_path, mtime_ns, size, _graph, _nstart=None):
+    """
+    计算 PageRank（_graph / _nstart 不参与缓存键）
+    
+    Returns:
+        (Top 15 列表, 完整分数字典)
+    """
+    _, GraphAnalytics, _ = _mine_deps()
+    analytics = GraphAnalytics(_graph, data_path)
+    pagerank_top = analytics.compute_pagerank(top_n=15, nstart=_nstart)
+    return pagerank_top, analytics.pagerank_scores
+
+
+@st.cache_data(show_spinner=False, ttl=24 * 3600)
+def _mine_rising_edges(data_path, mtime_ns, size, recent_days=7, historical_days=30, top_n=10):
+    """
+    发现趋势边（只依赖数据和窗口参数，调整窗口时无需重建图谱）
+    
+    Returns:
+        (rising_edges, window_stats)
+    """
+    _, GraphAnalytics, _ = _mine_deps()
+    analytics = GraphAnalytics(data_path=data_path)
+    analytics.items = _load_jsonl_cached(data_path, mtime_ns, size)
+    return analytics.find_rising_edges(
+        recent_days=recent_days,
+        historical_days=historical_days,
+        top_n=top_n
+    )
+
+
+@st.cache_data(show_spinner=False)
+def _load_jsonl_cached(path, mtime_ns, size):
+    """解析 JSONL，结果按 (路径, 修改时间, 大小) 缓存"""
+    with open(path, "rb") as f:
+        # 解析器本身容忍行尾换行符；空白行用 isspace() 判断，不再为 strip() 复制整行
+        return [fast_json.loads(line) for line in f if not line.isspace()]
+
+
 def load_jsonl(path):
     """加载 JSONL 文件"""
-    items = []
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            for line in f:
-                items.append(json.loads(line.strip()))
+        stat = os.stat(path)
+        return _load_jsonl_cached(path, stat.st_mtime_ns, stat.st_size)
     except FileNotFoundError:
-        pass
-    return items
+        return []
+
+
+@st.cache_data(ttl=5, show_spinner=False)
+def _count_lines_cached(path, mtime_ns):
+    """统计文件行数，结果按 (路径, 修改时间) 缓存"""
+    try:
+        return count_lines_in_file(path)
+    except FileNotFoundError:
+        return 0
 
 
 def count_lines(path):
     """统计文件行数"""
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return sum(1 for _ in f)
+        mtime_ns = os.stat(path).st_mtime_ns
     except FileNotFoundError:
         return 0
+    return _count_lines_cached(path, mtime_ns)
 
 
 def save_jsonl(items, path):
     """保存 JSONL 文件"""
     os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        for item in items:
-            f.write(json.dumps(item, ensure_ascii=False) + "\n")
+    with open(path, "wb") as f:
+        f.writelines(fast_json.dumps(item, newline=True) for item in items)
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _insights_content(graph_key, pagerank_top, rising_edges, window_stats, keyword, _graph):
+    """
+    洞察面板内容（社区检测 + 文案生成），按图谱指纹缓存，跨重跑、跨会话复用
+    
+    图谱由数据文件唯一决定，graph_key 即数据文件 (路径, 修改时间, 大小)，
+    无需序列化整张图来计算缓存键；_graph 不参与缓存键。
+    """
+    from src.app.components.insights import build_insights_content
+    
+    return build_insights_content(_graph, pagerank_top, rising_edges, window_stats, keyword)
 
 
 # ============= 侧边栏：控制面板 =============
@@ -176,6 +269,12 @@ with st.sidebar:
                 st.session_state.crawl_keyword = crawl_keyword
                 st.session_state.crawl_count = crawl_count
     
+    # === 趋势窗口参数（只影响 Rising Edges，调整后再次 Mine 会复用已构建的图谱）===
+    with st.expander("🎛️ 趋势窗口参数", expanded=False):
+        recent_days = st.number_input("Recent 窗口（天）", min_value=1, max_value=30, value=7)
+        historical_days = st.number_input("Historical 窗口（天）", min_value=7, max_value=180, value=30)
+        rising_top_n = st.number_input("趋势边数量", min_value=5, max_value=30, value=10)
+    
     # === 一键挖掘按钮 ===
     st.markdown("---")
     mine_button = st.button("🔍 Mine（挖掘）", type="primary", use_container_width=True)
@@ -266,71 +365,534 @@ with st.sidebar:
 
 # 初始化 session state
 if 'logs' not in st.session_state:
-    st.session_state.logs = []
+    st.session_state.logs = deque(maxlen=10)
 
 def add_log(msg, level="INFO"):
     """添加日志"""
     timestamp = datetime.now().strftime("%H:%M:%S")
     log_entry = f"[{timestamp}] {level}: {msg}"
     st.session_state.logs.append(log_entry)
-    if len(st.session_state.logs) > 50:  # 保留最近50条
-        st.session_state.logs = st.session_state.logs[-50:]
 
 
-def fix_html_relative_paths(html_content: str, html_path: str) -> str:
+# 原帖样本表格用到的字段；加载后补齐缺失键，渲染时用 itemgetter 一次取出
+SAMPLE_FIELDS = ("title", "desc", "time", "tags", "images", "url")
+get_sample_fields = itemgetter(*SAMPLE_FIELDS)
+
+
+def normalize_sample_fields(items):
+    """补齐原帖缺失的展示字段（缺失值记为 None，渲染时统一填充默认值）"""
+    for item in items:
+        for field in SAMPLE_FIELDS:
+            item.setdefault(field, None)
+    return items
+
+
+def build_pagerank_df(pagerank_top):
+    """PageRank 榜单表格（挖掘完成时构建一次，重跑时直接复用）"""
+    return pd.DataFrame({
+        "排名": list(range(1, len(pagerank_top) + 1)),
+        "标签": [tag for tag, _ in pagerank_top],
+        "PageRank": [f"{score:.4f}" for _, score in pagerank_top]
+    })
+
+
+def build_rising_df(rising_edges, mode):
+    """Rising Edges 榜单表格，按模式显示不同列（挖掘完成时构建一次）"""
+    if mode == "fallback":
+        return pd.DataFrame({
+            "排名": list(range(1, len(rising_edges) + 1)),
+            "标签组合": [f"{tag1} ↔ {tag2}" for tag1, tag2, _, _ in rising_edges],
+            "共现次数": [details.get('total_count', 0) for _, _, _, details in rising_edges]
+        })
+    return pd.DataFrame({
+        "排名": list(range(1, len(rising_edges) + 1)),
+        "标签组合": [f"{tag1} ↔ {tag2}" for tag1, tag2, _, _ in rising_edges],
+        "增幅": [f"+{details.get('growth_rate', 0)*100:.1f}%" for _, _, _, details in rising_edges],
+        "Recent": [details.get('recent_count', 0) for _, _, _, details in rising_edges],
+        "Historical": [details.get('historical_count', 0) for _, _, _, details in rising_edges]
+    })
+
+
+# 局部重跑装饰器：旧版 Streamlit 只有 experimental_fragment，再旧则退化为普通函数（整页重跑）
+fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda func: func)
+
+
+def tab_is_open(tab):
+    """tab 是否需要渲染：惰性 tabs 下只渲染选中的 tab，旧版 Streamlit（open 为 None）全部渲染"""
+    return getattr(tab, "open", None) is not False
+
+
+def render_mine_step(ui, progress, text):
     """
-    修复 HTML 中的相对路径，将本地 JS 文件内嵌到 HTML 中
+    在同一个占位容器里重绘挖掘进度（每个步骤只产生一次前端更新）
     
     Args:
-        html_content: HTML 内容
-        html_path: HTML 文件路径（用于解析相对路径）
+        ui: st.empty() 占位容器
+        progress: 进度（0~1）
+        text: 状态文本
+    """
+    with ui.container():
+        st.progress(progress)
+        st.text(text)
+        with st.expander("📋 详细日志", expanded=True):
+            st.code("\n".join(st.session_state.logs))
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def _prepared_graph_html(graph_path, mtime_ns):
+    """
+    读取图谱 HTML（生成时已内嵌本地 JS），结果按 (路径, 修改时间) 缓存
     
     Returns:
-        修复后的 HTML 内容
+        (原始字节, HTML 文本)；文件为空或过小时后者为 None
     """
-    import re
-    from pathlib import Path
+    with open(graph_path, "rb") as f:
+        html_bytes = f.read()
+    
+    if not html_bytes or len(html_bytes) < 100:
+        return html_bytes, None
     
-    # 获取 HTML 文件所在目录
-    html_dir = Path(html_path).parent
-    project_root = Path(__file__).parent.parent.parent
+    return html_bytes, html_bytes.decode("utf-8")
+
+
+@fragment
+def render_posts_tab():
+    """原帖样本 tab（局部重跑：翻页只重跑本 tab，不触发整页重跑）"""
+    st.subheader("📄 原帖样本")
     
-    # 查找所有相对路径的 script 标签
-    pattern = r'<script\s+src=["\']([^"\']+)["\']\s*></script>'
+    items = st.session_state.get("items", [])
     
-    def replace_script(match):
-        script_path = match.group(1)
+    if items:
+        # 分页显示
+        items_per_page = 10
+        total_pages = (len(items) + items_per_page - 1) // items_per_page
         
-        # 只处理相对路径（不以 http:// 或 https:// 开头）
-        if script_path.startswith(('http://', 'https://', '//')):
-            return match.group(0)  # 保持 CDN 链接不变
+        page = st.selectbox("页码", range(1, total_pages + 1))
+        start_idx = (page - 1) * items_per_page
+        end_idx = min(start_idx + items_per_page, len(items))
         
-        # 解析相对路径
-        if script_path.startswith('/'):
-            # 绝对路径（相对于项目根目录）
-            full_path = project_root / script_path.lstrip('/')
-        else:
-            # 相对路径（相对于 HTML 文件所在目录）
-            full_path = html_dir / script_path
+        page_items = items[start_idx:end_idx]
         
-        # 如果文件存在，读取并内嵌
-        if full_path.exists() and full_path.is_file():
-            try:
-                with open(full_path, "r", encoding="utf-8") as f:
-                    js_content = f.read()
-                # 替换为内嵌 script
-                return f'<script>\n{js_content}\n</script>'
-            except Exception as e:
-                # 如果读取失败，保持原样
-                return match.group(0)
-        else:
-            # 文件不存在，保持原样
-            return match.group(0)
+        # 整页一次性渲染为一张表（按列向量化处理），不再逐条创建 expander
+        df = pd.DataFrame(list(map(get_sample_fields, page_items)), columns=SAMPLE_FIELDS)
+        desc = df["desc"].fillna("")
+        desc_short = desc.str.slice(0, 300)
+        page_df = pd.DataFrame({
+            "序号": range(start_idx + 1, end_idx + 1),
+            "标题": df["title"].fillna(""),
+            "描述": desc_short.where(desc.str.len() <= 300, desc_short + "..."),
+            "时间": df["time"].fillna("未知"),
+            "标签": df["tags"].map(lambda tags: ", ".join(tags) if isinstance(tags, list) else ""),
+            "图片数": df["images"].map(lambda images: len(images) if isinstance(images, list) else 0),
+            "原文": df["url"]
+        })
+        st.dataframe(
+            page_df,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "原文": st.column_config.LinkColumn("原文", display_text="🔗 查看原文")
+            }
+        )
+    else:
+        st.info("暂无数据")
+
+
+@fragment
+def render_generate_tab():
+    """生成文案 tab（局部重跑：调整生成参数只重跑本 tab）"""
+    st.subheader("✨ 文案/素材包生成")
+    st.caption("基于挖掘结果生成创作素材（模板引擎，无需 LLM）")
     
-    # 替换所有匹配的 script 标签
-    fixed_html = re.sub(pattern, replace_script, html_content)
+    # 检查是否已挖掘
+    pagerank_top = st.session_state.get("pagerank_top", [])
+    rising_edges = st.session_state.get("rising_edges", [])
     
-    return fixed_html
+    if not pagerank_top:
+        st.warning("⚠️ 请先在左侧点击 Mine 完成挖掘")
+    else:
+        # 生成参数
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            gen_keyword = st.text_input(
+                "关键词",
+                value="AI工具",
+                help="文案主题关键词"
+            )
+            
+            gen_count = st.number_input(
+                "生成数量",
+                min_value=1,
+                max_value=20,
+                value=5,
+                help="生成草稿数量"
+            )
+        
+        with col2:
+            account_mode = st.radio(
+                "账号模式",
+                ["单账号", "多账号（3个）"],
+                help="分配到不同账号"
+            )
+            
+            image_mode = st.radio(
+                "图片模式",
+                ["No images", "Source images (引用原帖)"],
+                help="素材包是否包含图片"
+            )
+        
+        # LLM 可选增强
+        st.markdown("---")
+        use_llm = st.checkbox(
+            "🤖 Use LLM Enhance（可选）",
+            value=False,
+            help="使用大模型优化文案（需配置 API Key）"
+        )
+        
+        if use_llm:
+            with st.expander("⚙️ LLM 配置", expanded=False):
+                llm_provider = st.selectbox(
+                    "Provider",
+                    ["DeepSeek", "OpenAI", "通义千问", "文心一言"],
+                    help="选择大模型提供商"
+                )
+                
+                llm_api_key = st.text_input(
+                    "API Key",
+                    type="password",
+                    placeholder="sk-...",
+                    help="留空则使用模板引擎"
+                )
+                
+                if not llm_api_key:
+                    st.warning("⚠️ 未配置 API Key，将使用模板引擎生成")
+        
+        st.markdown("---")
+        
+        # 检查模板引擎是否可用
+        if not TEMPLATE_ENGINE_AVAILABLE:
+            st.error(f"❌ 生成模块未就绪：{TEMPLATE_ENGINE_ERROR}")
+            st.info("💡 提示：图谱分析和原帖样本功能仍可正常使用")
+            st.stop()
+        
+        # 生成按钮
+        if st.button("🎨 生成文案包", type="primary", use_container_width=True):
+            with st.spinner("正在生成文案..."):
+                try:
+                    # 准备数据
+                    top_tags = [tag for tag, _ in pagerank_top[:10]]
+                    top_edges_data = [(t1, t2, 0.0) for t1, t2, _, _ in rising_edges[:10]]
+                    
+                    # 创建生成器
+                    engine = TemplateEngine(top_tags, top_edges_data)
+                    
+                    # 检查 LLM 配置
+                    use_llm_generation = False
+                    if use_llm:
+                        if llm_api_key and llm_api_key.strip():
+                            use_llm_generation = True
+                            st.info(f"🤖 使用 {llm_provider} 生成")
+                        else:
+                            st.warning("⚠️ API Key 未配置，使用模板引擎")
+                    
+                    # 生成草稿
+                    if account_mode == "多账号（3个）":
+                        accounts = ["测评号", "教程号", "效率号"]
+                    else:
+                        accounts = ["主账号"]
+                    
+                    drafts = []
+                    llm_success_count = 0
+                    
+                    # 如果启用 LLM 且有 API Key
+                    if use_llm_generation and LLM_CLIENT_AVAILABLE and generate_with_llm:
+                        styles = ["清单型", "对比型", "避坑型", "教程型"]
+                        
+                        # 获取原帖标题作为参考
+                        original_titles = []
+                        items = st.session_state.get("items", [])
+                        for item in items[:5]:
+                            if item.get("title"):
+                                original_titles.append(item["title"])
+                        
+                        # 尝试用 LLM 生成：各条请求互不依赖，并发发出（最多 8 个线程）
+                        progress_bar = st.progress(0, text="正在调用 LLM API...")
+                        llm_results = [None] * gen_count
+                        
+                        with ThreadPoolExecutor(max_workers=min(gen_count, 8)) as executor:
+                            future_to_slot = {
+                                executor.submit(
+                                    generate_with_llm,
+                                    keyword=gen_keyword,
+                                    top_tags=top_tags,
+                                    top_edges=[(t1, t2) for t1, t2, _ in top_edges_data],
+                                    provider=llm_provider,
+                                    api_key=llm_api_key,
+                                    style=styles[i % len(styles)],
+                                    original_titles=original_titles
+                                ): i
+                                for i in range(gen_count)
+                            }
+                            
+                            # 工作线程不能直接调用 Streamlit，进度和异常提示都在主线程里处理
+                            for done, future in enumerate(as_completed(future_to_slot), 1):
+                                try:
+                                    llm_results[future_to_slot[future]] = future.result()
+                                except Exception as llm_err:
+                                    st.warning(f"⚠️ LLM 调用异常: {llm_err}")
+                                progress_bar.progress(done / gen_count, text=f"LLM 生成中... {done}/{gen_count}")
+                        
+                        # 按原顺序组装草稿，失败的位置用模板引擎补充
+                        for i, llm_result in enumerate(llm_results):
+                            if llm_result:
+                                llm_result["account"] = accounts[i % len(accounts)]
+                                llm_result["content_style"] = styles[i % len(styles)]
+                                drafts.append(llm_result)
+                                llm_success_count += 1
+                            else:
+                                # LLM 失败，用模板引擎补充
+                                template_draft = engine.generate_draft(gen_keyword)
+                                template_draft["account"] = accounts[i % len(accounts)]
+                                template_draft["fallback_reason"] = "LLM API 调用失败"
+                                drafts.append(template_draft)
+                        
+                        progress_bar.empty()
+                        
+                        if llm_success_count > 0:
+                            st.success(f"🤖 LLM 成功生成 {llm_success_count} 条")
+                        if llm_success_count < gen_count:
+                            st.warning(f"⚠️ {gen_count - llm_success_count} 条使用模板引擎回退")
+                    
+                    else:
+                        # 使用模板引擎生成
+                        drafts = engine.generate_batch(
+                            keyword=gen_keyword,
+                            count=gen_count,
+                            accounts=accounts
+                        )
+                    
+                    # 保存到 session state
+                    st.session_state.generated_drafts = drafts
+                    st.session_state.package_keyword = gen_keyword
+                    
+                    st.success(f"✅ 已生成 {len(drafts)} 条草稿")
+                    st.rerun()
+                
+                except Exception as e:
+                    st.error(f"生成失败: {e}")
+        
+        # 显示生成结果
+        if st.session_state.get("generated_drafts"):
+            drafts = st.session_state.generated_drafts
+            
+            st.markdown("---")
+            st.subheader(f"📝 草稿预览（共 {len(drafts)} 条）")
+            
+            # 显示前3条预览
+            for i, draft in enumerate(drafts[:3], 1):
+                with st.expander(f"草稿 {i}/{len(drafts)}: {draft['title'][:50]}..."):
+                    st.markdown(f"**账号**: {draft.get('account', 'N/A')}")
+                    st.markdown(f"**标题**: {draft['title']}")
+                    st.markdown(f"**正文**:\n\n{draft['body']}")
+                    st.markdown(f"**标签**: {', '.join(draft['hashtags'][:6])}")
+                    st.markdown(f"**生成方式**: {draft.get('generation_method', 'template')}")
+            
+            if len(drafts) > 3:
+                st.caption(f"...还有 {len(drafts)-3} 条草稿，下载完整包查看")
+            
+            # 导出按钮
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                if st.button("📦 保存草稿包", use_container_width=True):
+                    if not TEMPLATE_ENGINE_AVAILABLE or save_drafts_package is None:
+                        st.error("❌ 生成模块未就绪，无法保存")
+                    else:
+                        package_path = save_drafts_package(drafts)
+                        st.success(f"✅ 已保存到: {package_path}")
+            
+            with col2:
+                # 打包为 ZIP 并下载
+                if st.button("📥 下载 ZIP", use_container_width=True):
+                    # 在内存中打包 ZIP，不经过临时文件
+                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                    zip_buffer = io.BytesIO()
+                    
+                    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
+                        # drafts.jsonl
+                        drafts_content = b"\n".join(fast_json.dumps(d) for d in drafts)
+                        zf.writestr("drafts.jsonl", drafts_content)
+                        
+                        # README
+                        readme = f"""草稿包
+
+关键词: {st.session_state.get('package_keyword', 'N/A')}
+生成数量: {len(drafts)}
+生成时间: {timestamp}
+
+使用方法：
+1. 打开 drafts.jsonl
+2. 每行是一条草稿（JSON格式）
+3. 可根据 account 字段分配到不同账号
+
+字段说明：
+- title: 标题
+- body: 正文
+- hashtags: 推荐标签
+- account: 账号分配
+"""
+                        zf.writestr("README.txt", readme)
+                    
+                    st.download_button(
+                        label="💾 下载草稿包",
+                        data=zip_buffer.getvalue(),
+                        file_name=f"drafts_{timestamp}.zip",
+                        mime="application/zip",
+                        use_container_width=True
+                    )
+
+
+def render_results():
+    """
+    渲染挖掘结果（图谱分析 / 原帖样本 / 生成文案）
+    
+    挖掘成功后在同一轮脚本中直接调用，无需 st.rerun()；
+    之后的组件交互触发自然重跑时，从 session_state 读取结果再次渲染。
+    """
+    st.success("✅ 挖掘完成！")
+    
+    # Tabs（新增 Generate Tab）
+    tab_labels = ["📊 图谱分析", "📝 原帖样本", "✨ 生成文案"]
+    try:
+        # 惰性 tabs：切换时重跑，只执行当前选中 tab 的内容
+        tab1, tab2, tab3 = st.tabs(tab_labels, key="result_tab", on_change="rerun")
+    except TypeError:
+        # 旧版 Streamlit 不支持惰性 tabs，退回全部渲染
+        tab1, tab2, tab3 = st.tabs(tab_labels)
+    
+    with tab1:
+        if tab_is_open(tab1):
+            # === 洞察与建议面板（新增，放在最上方）===
+            # 从 session_state 获取数据（兜底机制）
+            graph_obj = st.session_state.get("graph_obj")
+            pr_top = st.session_state.get("pagerank_top", [])
+            rs_edges = st.session_state.get("rising_edges", [])
+            ws_stats = st.session_state.get("window_stats", {})
+            
+            if graph_obj and pr_top:
+                try:
+                    from src.app.components.insights import render_insights_panel
+                    
+                    render_insights_panel(
+                        graph=graph_obj,
+                        pagerank_top=pr_top,
+                        rising_edges=rs_edges,
+                        window_stats=ws_stats,
+                        keyword="AI工具",
+                        content=_insights_content(
+                            st.session_state.get("graph_key"), pr_top, rs_edges, ws_stats, "AI工具",
+                            _graph=graph_obj
+                        )
+                    )
+                    st.markdown("---")
+                except Exception as e:
+                    st.warning(f"洞察面板加载失败: {e}")
+            elif not pr_top:
+                st.info("💡 请先点击侧边栏的 **Mine** 按钮生成图谱分析结果")
+            
+            # === 图谱可视化 ===
+            st.subheader("🕸️ 标签共现图谱")
+            
+            graph_path = st.session_state.get("graph_path")
+            
+            if not graph_path or not os.path.exists(graph_path):
+                st.warning("⚠️ 图谱文件不存在，请先点击 Mine 按钮")
+            else:
+                try:
+                    # 读取 HTML（文件未变化时直接复用缓存）
+                    html_bytes, html_content = _prepared_graph_html(
+                        graph_path, os.stat(graph_path).st_mtime_ns
+                    )
+                    
+                    if html_content is None:
+                        st.error(f"❌ 图谱文件为空或损坏: {graph_path}")
+                    else:
+                        # 显示文件信息
+                        st.caption(f"📁 图谱文件: {graph_path}")
+                        
+                        # 内嵌图谱（关键：足够的高度 + 允许滚动）
+                        st.components.v1.html(html_content, height=800, scrolling=True)
+                        
+                        # 下载和查看按钮
+                        col1, col2 = st.columns([1, 3])
+                        with col1:
+                            st.download_button(
+                                label="📥 下载图谱 HTML",
+                                data=html_bytes,
+                                file_name="tag_graph.html",
+                                mime="text/html",
+                                use_container_width=True
+                            )
+                        with col2:
+                            st.info(f"💡 图谱已生成，包含 {st.session_state.get('graph_nodes', 0)} 个节点")
+                
+                except Exception as e:
+                    st.error(f"❌ 图谱加载失败: {e}")
+                    st.code(f"路径: {graph_path}")
+                    st.code(traceback.format_exc())
+            
+            st.markdown("---")
+            
+            # === 两列：PageRank + Rising Edges ===
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                st.subheader("🏆 PageRank Top 榜单")
+                st.caption("核心话题标签排名（基于图结构重要性）")
+                
+                pr_df = st.session_state.get("pr_df")
+                if pr_df is not None:
+                    st.dataframe(pr_df, use_container_width=True, hide_index=True)
+                else:
+                    st.info("暂无数据")
+            
+            with col2:
+                st.subheader("🔥 Rising Edges 趋势榜")
+                
+                window_stats = st.session_state.get("window_stats", {})
+                
+                # 显示诊断信息
+                mode = window_stats.get('mode', 'rising')
+                anchor_now = window_stats.get('anchor_now', 'N/A')
+                
+                # 模式标识
+                if mode == "fallback":
+                    st.warning("⚠️ 模式: Fallback (窗口样本不足，显示全局 Top Edges)")
+                else:
+                    st.success("✅ 模式: Rising (基于时间窗口对比)")
+                
+                # 窗口统计
+                st.caption(
+                    f"Anchor: {anchor_now} | "
+                    f"Recent: {window_stats.get('recent_count', 0)} | "
+                    f"Historical: {window_stats.get('historical_count', 0)} | "
+                    f"Total: {window_stats.get('total_count', 0)}"
+                )
+                
+                rising_df = st.session_state.get("rising_df")
+                if rising_df is not None:
+                    st.dataframe(rising_df, use_container_width=True, hide_index=True)
+                else:
+                    st.info("暂无数据")
+        
+    with tab2:
+        if tab_is_open(tab2):
+            render_posts_tab()
+        
+    with tab3:
+        if tab_is_open(tab3):
+            render_generate_tab()
 
 
 # === 爬取流程（真实数据模式）===
@@ -348,10 +910,6 @@ if st.session_state.get("trigger_crawl", False):
     status_text = st.empty()
     
     try:
-        import subprocess
-        import sys
-        import locale
-        
         # 使用子进程运行爬虫脚本（避免 Streamlit 环境的 asyncio 冲突）
         crawl_script = str(project_root / "scripts" / "test_crawl_raw.py")
         
@@ -366,23 +924,49 @@ if st.session_state.get("trigger_crawl", False):
             "--count", str(count)
         ]
         
-        # Windows 编码修复
-        encoding = 'utf-8' if sys.platform != 'win32' else locale.getpreferredencoding(False)
+        # 强制子进程以 UTF-8 输出（Windows 下默认是本地代码页），父进程统一按 UTF-8 解码
+        env = {**os.environ, "PYTHONIOENCODING": "utf-8", "PYTHONUTF8": "1"}
         
-        # 运行子进程
-        result = subprocess.run(
+        # 运行子进程：逐行读取输出并只保留最近 200 行，避免整段缓冲在内存中
+        process = subprocess.Popen(
             cmd,
             cwd=str(project_root),
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            env=env,
             text=True,
-            encoding=encoding,
-            errors='replace',  # 遇到无法解码的字符用替代符号
-            timeout=300  # 5分钟超时
+            encoding='utf-8',
+            errors='replace'  # 遇到无法解码的字符用替代符号
         )
         
+        # 5分钟超时：到时强制结束子进程
+        timed_out = threading.Event()
+        
+        def kill_on_timeout():
+            timed_out.set()
+            process.kill()
+        
+        killer = threading.Timer(300, kill_on_timeout)
+        killer.start()
+        tail = deque(maxlen=200)
+        try:
+            for line in process.stdout:
+                tail.append(line)
+                if line.strip():
+                    status_text.text(f"🔄 {line.strip()[:100]}")
+            returncode = process.wait()
+        finally:
+            killer.cancel()
+            process.stdout.close()
+        
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(cmd, 300)
+        
+        crawl_log = "".join(tail)
+        
         progress_bar.progress(70)
         
-        if result.returncode == 0:
+        if returncode == 0:
             status_text.text("🔄 清洗数据...")
             
             # 运行清洗
@@ -399,8 +983,7 @@ if st.session_state.get("trigger_crawl", False):
             
             # 显示爬虫输出（添加空值检查）
             with st.expander("📋 爬虫日志", expanded=False):
-                stdout = result.stdout or ""
-                st.code(stdout[-2000:] if len(stdout) > 2000 else stdout)
+                st.code(crawl_log)
             
             # 清除旧数据缓存，强制重新加载
             st.session_state.mining_done = False
@@ -408,6 +991,8 @@ if st.session_state.get("trigger_crawl", False):
             st.session_state.items = []  # 清除缓存的数据
             st.session_state.pagerank_top = []
             st.session_state.rising_edges = []
+            st.session_state.pr_df = None
+            st.session_state.rising_df = None
             st.session_state.graph_obj = None
             st.session_state.graph_path = None
             
@@ -417,11 +1002,9 @@ if st.session_state.get("trigger_crawl", False):
         else:
             progress_bar.empty()
             status_text.empty()
-            st.error(f"❌ 爬取失败（退出码: {result.returncode}）")
+            st.error(f"❌ 爬取失败（退出码: {returncode}）")
             with st.expander("📋 错误详情", expanded=True):
-                stderr = result.stderr or ""
-                stdout = result.stdout or ""
-                st.code(stderr[-2000:] if stderr else stdout[-2000:])
+                st.code(crawl_log)
         
     except subprocess.TimeoutExpired:
         progress_bar.empty()
@@ -470,23 +1053,20 @@ elif st.session_state.get("trigger_mine", False):
     # 开始挖掘
     st.session_state.trigger_mine = False
     
-    # 进度显示
-    progress_bar = st.progress(0)
-    status_text = st.empty()
-    
-    # 日志显示
-    log_expander = st.expander("📋 详细日志", expanded=True)
-    with log_expander:
-        log_area = st.empty()
+    # 进度、状态与日志共用一个占位容器
+    mine_ui = st.empty()
     
     try:
         # === 步骤 1: 加载数据 ===
-        status_text.text("🔄 步骤 1/5: 加载数据...")
-        progress_bar.progress(0.1)
         add_log("开始加载数据文件")
+        render_mine_step(mine_ui, 0.1, "🔄 步骤 1/5: 加载数据...")
         
-        builder = TagCooccurrenceGraph(data_path)
-        items = builder.load_data()
+        try:
+            data_stat = os.stat(data_path)
+            data_key = (data_path, data_stat.st_mtime_ns, data_stat.st_size)
+            items = _load_jsonl_cached(*data_key)
+        except FileNotFoundError:
+            items = []
         
         if not items:
             add_log("❌ 数据文件为空或不存在", "ERROR")
@@ -494,16 +1074,14 @@ elif st.session_state.get("trigger_mine", False):
             st.session_state.mining_done = False
             st.stop()
         
+        normalize_sample_fields(items)
         add_log(f"✅ 成功加载 {len(items)} 条数据", "SUCCESS")
-        log_area.code("\n".join(st.session_state.logs[-10:]))
         
         # === 步骤 2: 构建图谱 ===
-        status_text.text("🔄 步骤 2/5: 构建图谱...")
-        progress_bar.progress(0.3)
         add_log("开始构建标签共现图")
-        log_area.code("\n".join(st.session_state.logs[-10:]))
+        render_mine_step(mine_ui, 0.3, "🔄 步骤 2/5: 构建图谱...")
         
-        graph = builder.build_graph()
+        graph = _mine_graph(*data_key)
         
         if graph.number_of_nodes() == 0:
             add_log("❌ 图谱为空（标签数量不足）", "ERROR")
@@ -512,522 +1090,88 @@ elif st.session_state.get("trigger_mine", False):
             st.stop()
         
         add_log(f"✅ 图谱构建完成: {graph.number_of_nodes()} 节点, {graph.number_of_edges()} 边", "SUCCESS")
-        log_area.code("\n".join(st.session_state.logs[-10:]))
         
         # === 步骤 3: 计算 PageRank ===
-        status_text.text("🔄 步骤 3/5: 计算 PageRank...")
-        progress_bar.progress(0.5)
         add_log("开始 PageRank 计算")
-        log_area.code("\n".join(st.session_state.logs[-10:]))
+        render_mine_step(mine_ui, 0.5, "🔄 步骤 3/5: 计算 PageRank...")
         
-        analytics = GraphAnalytics(graph, data_path)
-        pagerank_top = analytics.compute_pagerank(top_n=15)
+        # 以上一次挖掘的完整分数作为初始向量，爬取新增少量数据后迭代更快收敛
+        pagerank_top, st.session_state.pr_scores = _mine_pagerank(
+            *data_key,
+            _graph=graph,
+            _nstart=st.session_state.get("pr_scores")
+        )
         
         add_log(f"✅ PageRank 完成: Top {len(pagerank_top)} 标签", "SUCCESS")
-        log_area.code("\n".join(st.session_state.logs[-10:]))
         
         # === 步骤 4: 发现趋势边 ===
-        status_text.text("🔄 步骤 4/5: 发现趋势边...")
-        progress_bar.progress(0.7)
         add_log("开始 Rising Edges 分析")
-        log_area.code("\n".join(st.session_state.logs[-10:]))
+        render_mine_step(mine_ui, 0.7, "🔄 步骤 4/5: 发现趋势边...")
         
-        rising_edges, window_stats = analytics.find_rising_edges(
-            recent_days=7,
-            historical_days=30,
-            top_n=10
+        rising_edges, window_stats = _mine_rising_edges(
+            *data_key,
+            recent_days=int(recent_days),
+            historical_days=int(historical_days),
+            top_n=int(rising_top_n)
         )
         
         add_log(f"✅ 趋势分析完成: Recent {window_stats['recent_count']} | Historical {window_stats['historical_count']}", "SUCCESS")
-        log_area.code("\n".join(st.session_state.logs[-10:]))
         
         # === 步骤 5: 生成可视化 ===
-        status_text.text("🔄 步骤 5/5: 生成可视化...")
-        progress_bar.progress(0.9)
         add_log("开始生成交互式图谱")
-        log_area.code("\n".join(st.session_state.logs[-10:]))
+        render_mine_step(mine_ui, 0.9, "🔄 步骤 5/5: 生成可视化...")
         
+        _, _, GraphVisualizer = _mine_deps()
         visualizer = GraphVisualizer(graph, dict(pagerank_top))
         graph_path = str(project_root / "data/output/graph.html")
         visualizer.create_interactive_html(graph_path)
         
         add_log(f"✅ 图谱已生成: {graph_path}", "SUCCESS")
-        log_area.code("\n".join(st.session_state.logs[-10:]))
         
         # === 完成 ===
-        progress_bar.progress(1.0)
-        status_text.text("✅ 挖掘完成！")
         add_log("🎉 所有步骤成功完成", "SUCCESS")
-        log_area.code("\n".join(st.session_state.logs[-10:]))
+        render_mine_step(mine_ui, 1.0, "✅ 挖掘完成！")
         
         # 保存结果到 session state
         st.session_state.pagerank_top = pagerank_top
         st.session_state.rising_edges = rising_edges
         st.session_state.window_stats = window_stats
+        st.session_state.pr_df = build_pagerank_df(pagerank_top) if pagerank_top else None
+        st.session_state.rising_df = (
+            build_rising_df(rising_edges, window_stats.get("mode", "rising")) if rising_edges else None
+        )
         st.session_state.graph_path = graph_path
         st.session_state.items = items
         st.session_state.graph_nodes = graph.number_of_nodes()
         st.session_state.graph_edges = graph.number_of_edges()
         st.session_state.graph_obj = graph  # 保存图对象（用于洞察面板）
+        st.session_state.graph_key = data_key  # 图谱指纹（洞察面板缓存键）
         st.session_state.mine_done = True  # 标记挖掘完成
         
         # 清除触发状态，准备显示结果
         st.session_state.trigger_mine = False
         st.session_state.show_results = True  # 标记显示结果
         
-        st.success("✅ 挖掘完成！请查看下方结果")
-        
-        # 强制刷新以显示结果
-        st.rerun()
-        
     except Exception as e:
         add_log(f"❌ 失败: {str(e)}", "ERROR")
-        log_area.code("\n".join(st.session_state.logs[-10:]))
+        render_mine_step(mine_ui, 0, "❌ 挖掘失败")
         st.error(f"挖掘失败: {e}")
         st.session_state.mining_done = False
         st.session_state.trigger_mine = False
-        progress_bar.progress(0)
-        status_text.text("❌ 挖掘失败")
         st.stop()
-
-if st.session_state.get("show_results", False):
-    # 显示结果（Mine 成功后）
-    st.success("✅ 挖掘完成！")
-    
-    # Tabs（新增 Generate Tab）
-    tab1, tab2, tab3 = st.tabs(["📊 图谱分析", "📝 原帖样本", "✨ 生成文案"])
     
-    with tab1:
-        # === 洞察与建议面板（新增，放在最上方）===
-        # 从 session_state 获取数据（兜底机制）
-        graph_obj = st.session_state.get("graph_obj")
-        pr_top = st.session_state.get("pagerank_top", [])
-        rs_edges = st.session_state.get("rising_edges", [])
-        ws_stats = st.session_state.get("window_stats", {})
-        
-        if graph_obj and pr_top:
-            try:
-                render_insights_panel(
-                    graph=graph_obj,
-                    pagerank_top=pr_top,
-                    rising_edges=rs_edges,
-                    window_stats=ws_stats,
-                    keyword="AI工具"
-                )
-                st.markdown("---")
-            except Exception as e:
-                st.warning(f"洞察面板加载失败: {e}")
-        elif not pr_top:
-            st.info("💡 请先点击侧边栏的 **Mine** 按钮生成图谱分析结果")
-        
-        # === 图谱可视化 ===
-        st.subheader("🕸️ 标签共现图谱")
-        
-        graph_path = st.session_state.get("graph_path")
-        
-        if not graph_path or not os.path.exists(graph_path):
-            st.warning("⚠️ 图谱文件不存在，请先点击 Mine 按钮")
-        else:
-            try:
-                # 读取 HTML 内容
-                with open(graph_path, "r", encoding="utf-8") as f:
-                    html_content = f.read()
-                
-                if not html_content or len(html_content) < 100:
-                    st.error(f"❌ 图谱文件为空或损坏: {graph_path}")
-                else:
-                    # 修复相对路径问题：内嵌本地 JS 文件
-                    html_content = fix_html_relative_paths(html_content, graph_path)
-                    
-                    # 显示文件信息
-                    st.caption(f"📁 图谱文件: {graph_path}")
-                    
-                    # 内嵌图谱（关键：足够的高度 + 允许滚动）
-                    st.components.v1.html(html_content, height=800, scrolling=True)
-                    
-                    # 下载和查看按钮
-                    col1, col2 = st.columns([1, 3])
-                    with col1:
-                        with open(graph_path, "rb") as f:
-                            st.download_button(
-                                label="📥 下载图谱 HTML",
-                                data=f.read(),
-                                file_name="tag_graph.html",
-                                mime="text/html",
-                                use_container_width=True
-                            )
-                    with col2:
-                        st.info(f"💡 图谱已生成，包含 {st.session_state.get('graph_nodes', 0)} 个节点")
-            
-            except Exception as e:
-                st.error(f"❌ 图谱加载失败: {e}")
-                st.code(f"路径: {graph_path}")
-                import traceback
-                st.code(traceback.format_exc())
-        
-        st.markdown("---")
-        
-        # === 两列：PageRank + Rising Edges ===
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.subheader("🏆 PageRank Top 榜单")
-            st.caption("核心话题标签排名（基于图结构重要性）")
-            
-            pagerank_top = st.session_state.get("pagerank_top", [])
-            if pagerank_top:
-                import pandas as pd
-                df = pd.DataFrame({
-                    "排名": list(range(1, len(pagerank_top) + 1)),
-                    "标签": [tag for tag, _ in pagerank_top],
-                    "PageRank": [f"{score:.4f}" for _, score in pagerank_top]
-                })
-                st.dataframe(df, use_container_width=True, hide_index=True)
-            else:
-                st.info("暂无数据")
-        
-        with col2:
-            st.subheader("🔥 Rising Edges 趋势榜")
-            
-            window_stats = st.session_state.get("window_stats", {})
-            rising_edges = st.session_state.get("rising_edges", [])
-            
-            # 显示诊断信息
-            mode = window_stats.get('mode', 'rising')
-            anchor_now = window_stats.get('anchor_now', 'N/A')
-            
-            # 模式标识
-            if mode == "fallback":
-                st.warning("⚠️ 模式: Fallback (窗口样本不足，显示全局 Top Edges)")
-            else:
-                st.success("✅ 模式: Rising (基于时间窗口对比)")
-            
-            # 窗口统计
-            st.caption(
-                f"Anchor: {anchor_now} | "
-                f"Recent: {window_stats.get('recent_count', 0)} | "
-                f"Historical: {window_stats.get('historical_count', 0)} | "
-                f"Total: {window_stats.get('total_count', 0)}"
-            )
-            
-            if rising_edges:
-                import pandas as pd
-                
-                # 根据模式显示不同列
-                if mode == "fallback":
-                    df = pd.DataFrame({
-                        "排名": list(range(1, len(rising_edges) + 1)),
-                        "标签组合": [f"{tag1} ↔ {tag2}" for tag1, tag2, _, _ in rising_edges],
-                        "共现次数": [details.get('total_count', 0) for _, _, _, details in rising_edges]
-                    })
-                else:
-                    df = pd.DataFrame({
-                        "排名": list(range(1, len(rising_edges) + 1)),
-                        "标签组合": [f"{tag1} ↔ {tag2}" for tag1, tag2, _, _ in rising_edges],
-                        "增幅": [f"+{details.get('growth_rate', 0)*100:.1f}%" for _, _, _, details in rising_edges],
-                        "Recent": [details.get('recent_count', 0) for _, _, _, details in rising_edges],
-                        "Historical": [details.get('historical_count', 0) for _, _, _, details in rising_edges]
-                    })
-                
-                st.dataframe(df, use_container_width=True, hide_index=True)
-            else:
-                st.info("暂无数据")
-    
-    with tab2:
-        st.subheader("📄 原帖样本")
-        
-        items = st.session_state.get("items", [])
-        
-        if items:
-            # 分页显示
-            items_per_page = 10
-            total_pages = (len(items) + items_per_page - 1) // items_per_page
-            
-            page = st.selectbox("页码", range(1, total_pages + 1))
-            start_idx = (page - 1) * items_per_page
-            end_idx = min(start_idx + items_per_page, len(items))
-            
-            page_items = items[start_idx:end_idx]
-            
-            for i, item in enumerate(page_items, start_idx + 1):
-                with st.expander(f"📝 笔记 {i}: {item.get('title', '无标题')[:60]}..."):
-                    col1, col2 = st.columns([3, 1])
-                    
-                    with col1:
-                        st.markdown(f"**标题**: {item.get('title', '')}")
-                        desc = item.get('desc', '')
-                        st.markdown(f"**描述**: {desc[:300]}{'...' if len(desc) > 300 else ''}")
-                        st.markdown(f"**时间**: {item.get('time', '未知')}")
-                    
-                    with col2:
-                        tags = item.get('tags', [])
-                        st.markdown(f"**标签** ({len(tags)}):")
-                        st.write(", ".join(tags[:6]))
-                        if len(tags) > 6:
-                            st.caption(f"...还有 {len(tags)-6} 个")
-                        
-                        st.markdown(f"**图片数**: {len(item.get('images', []))}")
-                        
-                        if item.get('url'):
-                            st.markdown(f"[🔗 查看原文]({item['url']})")
-        else:
-            st.info("暂无数据")
-    
-    with tab3:
-        st.subheader("✨ 文案/素材包生成")
-        st.caption("基于挖掘结果生成创作素材（模板引擎，无需 LLM）")
-        
-        # 检查是否已挖掘
-        pagerank_top = st.session_state.get("pagerank_top", [])
-        rising_edges = st.session_state.get("rising_edges", [])
-        
-        if not pagerank_top:
-            st.warning("⚠️ 请先在左侧点击 Mine 完成挖掘")
-        else:
-            # 生成参数
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                gen_keyword = st.text_input(
-                    "关键词",
-                    value="AI工具",
-                    help="文案主题关键词"
-                )
-                
-                gen_count = st.number_input(
-                    "生成数量",
-                    min_value=1,
-                    max_value=20,
-                    value=5,
-                    help="生成草稿数量"
-                )
-            
-            with col2:
-                account_mode = st.radio(
-                    "账号模式",
-                    ["单账号", "多账号（3个）"],
-                    help="分配到不同账号"
-                )
-                
-                image_mode = st.radio(
-                    "图片模式",
-                    ["No images", "Source images (引用原帖)"],
-                    help="素材包是否包含图片"
-                )
-            
-            # LLM 可选增强
-            st.markdown("---")
-            use_llm = st.checkbox(
-                "🤖 Use LLM Enhance（可选）",
-                value=False,
-                help="使用大模型优化文案（需配置 API Key）"
-            )
-            
-            if use_llm:
-                with st.expander("⚙️ LLM 配置", expanded=False):
-                    llm_provider = st.selectbox(
-                        "Provider",
-                        ["DeepSeek", "OpenAI", "通义千问", "文心一言"],
-                        help="选择大模型提供商"
-                    )
-                    
-                    llm_api_key = st.text_input(
-                        "API Key",
-                        type="password",
-                        placeholder="sk-...",
-                        help="留空则使用模板引擎"
-                    )
-                    
-                    if not llm_api_key:
-                        st.warning("⚠️ 未配置 API Key，将使用模板引擎生成")
-            
-            st.markdown("---")
-            
-            # 检查模板引擎是否可用
-            if not TEMPLATE_ENGINE_AVAILABLE:
-                st.error(f"❌ 生成模块未就绪：{TEMPLATE_ENGINE_ERROR}")
-                st.info("💡 提示：图谱分析和原帖样本功能仍可正常使用")
-                st.stop()
-            
-            # 生成按钮
-            if st.button("🎨 生成文案包", type="primary", use_container_width=True):
-                with st.spinner("正在生成文案..."):
-                    try:
-                        # 准备数据
-                        top_tags = [tag for tag, _ in pagerank_top[:10]]
-                        top_edges_data = [(t1, t2, 0.0) for t1, t2, _, _ in rising_edges[:10]]
-                        
-                        # 创建生成器
-                        engine = TemplateEngine(top_tags, top_edges_data)
-                        
-                        # 检查 LLM 配置
-                        use_llm_generation = False
-                        if use_llm:
-                            if llm_api_key and llm_api_key.strip():
-                                use_llm_generation = True
-                                st.info(f"🤖 使用 {llm_provider} 生成")
-                            else:
-                                st.warning("⚠️ API Key 未配置，使用模板引擎")
-                        
-                        # 生成草稿
-                        if account_mode == "多账号（3个）":
-                            accounts = ["测评号", "教程号", "效率号"]
-                        else:
-                            accounts = ["主账号"]
-                        
-                        drafts = []
-                        llm_success_count = 0
-                        
-                        # 如果启用 LLM 且有 API Key
-                        if use_llm_generation and LLM_CLIENT_AVAILABLE and generate_with_llm:
-                            styles = ["清单型", "对比型", "避坑型", "教程型"]
-                            
-                            # 获取原帖标题作为参考
-                            original_titles = []
-                            items = st.session_state.get("items", [])
-                            for item in items[:5]:
-                                if item.get("title"):
-                                    original_titles.append(item["title"])
-                            
-                            # 尝试用 LLM 生成
-                            progress_bar = st.progress(0, text="正在调用 LLM API...")
-                            
-                            for i in range(gen_count):
-                                style = styles[i % len(styles)]
-                                progress_bar.progress((i + 1) / gen_count, text=f"LLM 生成中... {i+1}/{gen_count}")
-                                
-                                try:
-                                    llm_result = generate_with_llm(
-                                        keyword=gen_keyword,
-                                        top_tags=top_tags,
-                                        top_edges=[(t1, t2) for t1, t2, _ in top_edges_data],
-                                        provider=llm_provider,
-                                        api_key=llm_api_key,
-                                        style=style,
-                                        original_titles=original_titles
-                                    )
-                                except Exception as llm_err:
-                                    st.warning(f"⚠️ LLM 调用异常: {llm_err}")
-                                    llm_result = None
-                                
-                                if llm_result:
-                                    llm_result["account"] = accounts[i % len(accounts)]
-                                    llm_result["content_style"] = style
-                                    drafts.append(llm_result)
-                                    llm_success_count += 1
-                                else:
-                                    # LLM 失败，用模板引擎补充
-                                    template_draft = engine.generate_draft(gen_keyword)
-                                    template_draft["account"] = accounts[i % len(accounts)]
-                                    template_draft["fallback_reason"] = "LLM API 调用失败"
-                                    drafts.append(template_draft)
-                            
-                            progress_bar.empty()
-                            
-                            if llm_success_count > 0:
-                                st.success(f"🤖 LLM 成功生成 {llm_success_count} 条")
-                            if llm_success_count < gen_count:
-                                st.warning(f"⚠️ {gen_count - llm_success_count} 条使用模板引擎回退")
-                        
-                        else:
-                            # 使用模板引擎生成
-                            drafts = engine.generate_batch(
-                                keyword=gen_keyword,
-                                count=gen_count,
-                                accounts=accounts
-                            )
-                        
-                        # 保存到 session state
-                        st.session_state.generated_drafts = drafts
-                        st.session_state.package_keyword = gen_keyword
-                        
-                        st.success(f"✅ 已生成 {len(drafts)} 条草稿")
-                        st.rerun()
-                    
-                    except Exception as e:
-                        st.error(f"生成失败: {e}")
-            
-            # 显示生成结果
-            if st.session_state.get("generated_drafts"):
-                drafts = st.session_state.generated_drafts
-                
-                st.markdown("---")
-                st.subheader(f"📝 草稿预览（共 {len(drafts)} 条）")
-                
-                # 显示前3条预览
-                for i, draft in enumerate(drafts[:3], 1):
-                    with st.expander(f"草稿 {i}/{len(drafts)}: {draft['title'][:50]}..."):
-                        st.markdown(f"**账号**: {draft.get('account', 'N/A')}")
-                        st.markdown(f"**标题**: {draft['title']}")
-                        st.markdown(f"**正文**:\n\n{draft['body']}")
-                        st.markdown(f"**标签**: {', '.join(draft['hashtags'][:6])}")
-                        st.markdown(f"**生成方式**: {draft.get('generation_method', 'template')}")
-                
-                if len(drafts) > 3:
-                    st.caption(f"...还有 {len(drafts)-3} 条草稿，下载完整包查看")
-                
-                # 导出按钮
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    if st.button("📦 保存草稿包", use_container_width=True):
-                        if not TEMPLATE_ENGINE_AVAILABLE or save_drafts_package is None:
-                            st.error("❌ 生成模块未就绪，无法保存")
-                        else:
-                            package_path = save_drafts_package(drafts)
-                            st.success(f"✅ 已保存到: {package_path}")
-                
-                with col2:
-                    # 打包为 ZIP 并下载
-                    if st.button("📥 下载 ZIP", use_container_width=True):
-                        import zipfile
-                        import tempfile
-                        
-                        # 创建临时 ZIP
-                        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                        zip_buffer = tempfile.NamedTemporaryFile(delete=False, suffix=".zip")
-                        
-                        with zipfile.ZipFile(zip_buffer.name, 'w', zipfile.ZIP_DEFLATED) as zf:
-                            # drafts.jsonl
-                            drafts_content = "\n".join([json.dumps(d, ensure_ascii=False) for d in drafts])
-                            zf.writestr("drafts.jsonl", drafts_content)
-                            
-                            # README
-                            readme = f"""草稿包
-
-关键词: {st.session_state.get('package_keyword', 'N/A')}
-生成数量: {len(drafts)}
-生成时间: {timestamp}
-
-使用方法：
-1. 打开 drafts.jsonl
-2. 每行是一条草稿（JSON格式）
-3. 可根据 account 字段分配到不同账号
+    # 直接在本轮渲染结果，省去一次整页重跑
+    render_results()
 
-字段说明：
-- title: 标题
-- body: 正文
-- hashtags: 推荐标签
-- account: 账号分配
-"""
-                            zf.writestr("README.txt", readme)
-                        
-                        with open(zip_buffer.name, "rb") as f:
-                            st.download_button(
-                                label="💾 下载草稿包",
-                                data=f.read(),
-                                file_name=f"drafts_{timestamp}.zip",
-                                mime="application/zip",
-                                use_container_width=True
-                            )
-                        
-                        os.unlink(zip_buffer.name)
+elif st.session_state.get("show_results", False):
+    # 显示结果（Mine 成功后的后续重跑）
+    render_results()
 
 
 # === 日志展示（底部）===
 with st.expander("📋 系统日志（最近10条）", expanded=False):
     if st.session_state.logs:
-        st.code("\n".join(st.session_state.logs[-10:]), language="log")
+        st.code("\n".join(st.session_state.logs), language="log")
     else:
         st.info("暂无日志")
 
@@ -10,9 +10,15 @@ XHS Basic Crawler Adapter (Stage-1 稳定版)
 - 追加模式支持
 """
 import asyncio
-import json
+import atexit
+import contextvars
+import hashlib
+import logging
+import mmap
 import os
+import re
 import traceback
+import types
 from typing import Dict, Optional, Set
 from datetime import datetime
 
@@ -20,8 +26,54 @@ from base.base_crawler import AbstractStore
 import config
 from media_platform.xhs import XiaoHongShuCrawler
 from store.xhs import XhsStoreFactory
+from src.utils import jsonl as fast_json
+from src.utils.lines import count_lines
 from tools import utils
 
+# 当前上下文的配置覆盖：run() 中设置，本次爬取的协程及其派生任务可见，
+# 多个爬虫并发运行时互不干扰，也不再改写 config 模块本身
+_CONFIG_OVERRIDES: contextvars.ContextVar[Dict] = contextvars.ContextVar("xhs_config_overrides", default={})
+
+
+class _OverridableConfig(types.ModuleType):
+    """config 模块的属性读取优先返回当前上下文的覆盖值"""
+    
+    def __getattribute__(self, name):
+        overrides = _CONFIG_OVERRIDES.get()
+        if name in overrides:
+            return overrides[name]
+        return super().__getattribute__(name)
+
+
+config.__class__ = _OverridableConfig
+
+
+# 追加模式去重只需要 item_id：直接在原始字节上匹配，不做整行 JSON 解析
+# （字符串值里的引号都会被转义，不会误匹配正文中的 "item_id"）
+_ITEM_ID_RE = re.compile(rb'"item_id"\s*:\s*"([^"]+)"')
+
+# 超过该大小的文件提示内核顺序预读
+_MADV_SEQUENTIAL_MIN_BYTES = 100 * 1024 * 1024
+
+
+# 向量写：Windows 没有 os.writev，合并后单次 os.write（返回值语义相同）
+_writev = getattr(os, "writev", None) or (lambda fd, buffers: os.write(fd, b"".join(buffers)))
+
+
+def _id_hash(item_id: bytes) -> int:
+    """
+    item_id 的 64 位摘要（BLAKE2b，C 实现）
+    
+    去重集合只存整数，不保留 id 字符串；2^64 空间内误判概率可忽略
+    
+    Args:
+        item_id: UTF-8 编码的 item_id
+    
+    Returns:
+        64 位整数
+    """
+    return int.from_bytes(hashlib.blake2b(item_id, digest_size=8).digest(), "little")
+
 
 class JsonlStoreImplement(AbstractStore):
     """
@@ -32,15 +84,42 @@ class JsonlStoreImplement(AbstractStore):
     - 支持追加模式（不覆盖已有数据）
     - 去重（基于 item_id）
     - 容错处理（字段缺失不崩溃）
+    - 追加写入（工厂每条笔记都会新建实例，O_APPEND 文件描述符在类上共享，只打开一次）
+    - 异步批量写盘（笔记先入队，由单个后台写入任务攒批后在线程中写入，不阻塞事件循环）
     """
     
-    # 类变量：跨实例共享的去重集合
-    _seen_ids: Set[str] = set()
+    # 类变量：跨实例共享的去重集合（存 item_id 的 64 位摘要，见 _id_hash）
+    _seen_hashes: Set[int] = set()
     _instance_count: int = 0
+    # 已加载过已有 item_id 的输出文件：之后写入的笔记都已在去重集合里，无需重复扫描
+    _loaded_path: Optional[str] = None
+    
+    # 类变量：跨实例共享的 O_APPEND 文件描述符（每批记录一次 writev 直接交给内核，无用户态缓冲）
+    _fd: Optional[int] = None
+    _fd_path: Optional[str] = None
+    
+    # 类变量：写入队列与后台写入任务（首次 store_content 时在当前事件循环中创建）
+    _queue: Optional[asyncio.Queue] = None
+    _writer_task: Optional[asyncio.Task] = None
+    _writer_loop_ref: Optional[asyncio.AbstractEventLoop] = None
+    QUEUE_MAXSIZE = 1024
+    WRITE_BATCH_SIZE = 64
+    
+    # 类变量：进行中的爬取数（最后一个结束时才停止写入任务、关闭文件），
+    # 以及按爬取标识统计的已写入条数（并发爬取各自计数，互不混入）
+    _active_runs: int = 0
+    _written_counts: Dict[str, int] = {}
     
-    def __init__(self, output_path: str = "data/raw/annotations.jsonl", append_mode: bool = False, **kwargs):
+    def __init__(
+        self,
+        output_path: str = "data/raw/annotations.jsonl",
+        append_mode: bool = False,
+        run_key: Optional[str] = None,
+        **kwargs
+    ):
         super().__init__(**kwargs)
         self.output_path = output_path
+        self.run_key = run_key
         self.item_count = 0
         self.append_mode = append_mode
         
@@ -51,15 +130,19 @@ class JsonlStoreImplement(AbstractStore):
             os.makedirs(os.path.dirname(self.output_path), exist_ok=True)
             
             if self.append_mode:
-                # 追加模式：读取已有 item_id 用于去重
-                self._load_existing_ids()
-                utils.logger.info(f"[JsonlStore] 追加模式，已有 {len(JsonlStoreImplement._seen_ids)} 条数据")
+                # 追加模式：读取已有 item_id 用于去重。工厂在事件循环里为每条笔记新建实例，
+                # 这里的同步扫描会阻塞整个循环，因此同一文件只扫描一次
+                if JsonlStoreImplement._loaded_path != self.output_path:
+                    self._load_existing_ids()
+                    JsonlStoreImplement._loaded_path = self.output_path
+                    utils.logger.info(f"[JsonlStore] 追加模式，已有 {len(JsonlStoreImplement._seen_hashes)} 条数据")
             else:
                 # 覆盖模式：清空文件和去重集合
                 if JsonlStoreImplement._instance_count == 1:  # 只在第一个实例时清空
                     with open(self.output_path, "w", encoding="utf-8") as f:
                         pass
-                    JsonlStoreImplement._seen_ids.clear()
+                    JsonlStoreImplement._seen_hashes.clear()
+                    JsonlStoreImplement._loaded_path = None
                     utils.logger.info(f"[JsonlStore] 覆盖模式，文件已清空")
             
             utils.logger.info(f"[JsonlStore] 初始化完成，输出: {self.output_path}")
@@ -71,15 +154,15 @@ class JsonlStoreImplement(AbstractStore):
     def _load_existing_ids(self):
         """加载已存在的 item_id 用于去重"""
         try:
-            if os.path.exists(self.output_path):
-                with open(self.output_path, "r", encoding="utf-8") as f:
-                    for line in f:
-                        try:
-                            item = json.loads(line.strip())
-                            if item.get("item_id"):
-                                JsonlStoreImplement._seen_ids.add(item["item_id"])
-                        except json.JSONDecodeError:
-                            continue
+            if os.path.exists(self.output_path) and os.path.getsize(self.output_path) > 0:
+                # 只读映射整个文件，一次线性扫描取出所有 item_id，直接对原始字节求摘要
+                with open(self.output_path, "rb") as f, \
+                        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    if len(mm) >= _MADV_SEQUENTIAL_MIN_BYTES and hasattr(mm, "madvise"):
+                        mm.madvise(mmap.MADV_SEQUENTIAL)
+                    JsonlStoreImplement._seen_hashes.update(
+                        _id_hash(match.group(1)) for match in _ITEM_ID_RE.finditer(mm)
+                    )
         except Exception as e:
             utils.logger.warning(f"[JsonlStore] 加载已有数据失败: {e}")
     
@@ -101,10 +184,11 @@ class JsonlStoreImplement(AbstractStore):
         try:
             # 提取 note_id
             note_id = content_item.get("note_id", "") or ""
+            note_hash = _id_hash(str(note_id).encode("utf-8"))
             
             # 去重检查
-            if note_id in JsonlStoreImplement._seen_ids:
-                utils.logger.debug(f"[JsonlStore] 跳过重复: {note_id}")
+            if note_hash in JsonlStoreImplement._seen_hashes:
+                utils.logger.debug("[JsonlStore] 跳过重复: %s", note_id)
                 return
             
             # 处理 tags：从逗号分隔字符串转为列表
@@ -116,12 +200,17 @@ class JsonlStoreImplement(AbstractStore):
             # 处理时间：转为 ISO 格式
             time_iso = self._parse_time(content_item.get("time"))
             
-            # 提取标题和描述
-            title = str(content_item.get("title", "") or "").strip()
-            desc = str(content_item.get("desc", "") or "").strip()
+            # 提取标题和描述（绝大多数已是 str，直接 strip，不再经过 str() 复制）
+            title = content_item.get("title")
+            title = title.strip() if isinstance(title, str) else (str(title).strip() if title else "")
+            desc = content_item.get("desc")
+            desc = desc.strip() if isinstance(desc, str) else (str(desc).strip() if desc else "")
             
-            # 合并文本（用于 NLP 分析）- title + desc
-            text = f"{title} {desc}".strip() if title or desc else ""
+            # 合并文本（用于 NLP 分析）- title + desc；两者都已去空白，只有一方为空时才需要再 strip
+            if title and desc:
+                text = f"{title} {desc}"
+            else:
+                text = title or desc
             
             # 构造标准 schema（9个字段）
             standard_item = {
@@ -136,35 +225,41 @@ class JsonlStoreImplement(AbstractStore):
                 "images": images
             }
             
-            # 写入 JSONL（追加模式）
-            with open(self.output_path, "a", encoding="utf-8") as f:
-                f.write(json.dumps(standard_item, ensure_ascii=False) + "\n")
+            # 先登记再入队：队列满时 put 会挂起，检查与登记之间不能有 await，
+            # 否则同一 note_id 的其他协程也能通过去重检查；入队失败则撤销登记
+            JsonlStoreImplement._seen_hashes.add(note_hash)
+            try:
+                # 交给后台写入任务（队列满时在此等待，形成背压）
+                await self._ensure_writer().put((self.output_path, standard_item, self.run_key))
+            except BaseException:
+                JsonlStoreImplement._seen_hashes.discard(note_hash)
+                raise
             
             # 记录已保存
-            JsonlStoreImplement._seen_ids.add(note_id)
             self.item_count += 1
             
-            # 简化日志
+            # 简化日志（%-格式在日志级别放行后才拼接，%.8s / %.20s 代替切片）
             utils.logger.info(
-                f"[JsonlStore] ✓ #{self.item_count} | {note_id[:8]}... | "
-                f"tags:{len(tags)} imgs:{len(images)} | {title[:20]}..."
+                "[JsonlStore] ✓ #%d | %.8s... | tags:%d imgs:%d | %.20s...",
+                self.item_count, note_id, len(tags), len(images), title
             )
             
         except Exception as e:
             # 容错：记录错误但不中断
             utils.logger.warning(f"[JsonlStore] 保存失败（已跳过）: {e}")
-            utils.logger.debug(traceback.format_exc())
+            if utils.logger.isEnabledFor(logging.DEBUG):
+                utils.logger.debug(traceback.format_exc())
     
     def _parse_list_field(self, value) -> list:
-        """解析列表字段（逗号分隔字符串 -> 列表）"""
-        try:
-            if isinstance(value, list):
-                return [str(v).strip() for v in value if v]
-            if isinstance(value, str) and value.strip():
-                return [v.strip() for v in value.split(",") if v.strip()]
-            return []
-        except Exception:
+        """解析列表字段（逗号分隔字符串 -> 列表），各元素去空白，空元素丢弃"""
+        if not value:
             return []
+        if isinstance(value, str):
+            # 每段只 strip 一次，空串（含全空白输入）自然被过滤
+            return [v for v in map(str.strip, value.split(",")) if v]
+        if isinstance(value, list):
+            return [v for v in map(str.strip, map(str, filter(None, value))) if v]
+        return []
     
     def _parse_time(self, time_value) -> Optional[str]:
         """解析时间字段为 ISO 格式"""
@@ -172,11 +267,11 @@ class JsonlStoreImplement(AbstractStore):
             return None
         
         try:
+            # 时间戳（秒或毫秒，毫秒级 > 1e12），格式化交给 datetime 的 C 实现
             if isinstance(time_value, (int, float)):
-                # 时间戳（秒或毫秒）
-                if time_value > 1e12:  # 毫秒级
-                    time_value = time_value / 1000
-                return datetime.fromtimestamp(time_value).isoformat()
+                return datetime.fromtimestamp(
+                    time_value / 1000 if time_value > 1e12 else time_value
+                ).isoformat()
             elif isinstance(time_value, str):
                 # 已经是字符串，尝试标准化
                 return time_value.strip()
@@ -193,20 +288,137 @@ class JsonlStoreImplement(AbstractStore):
         """创作者数据暂不保存"""
         pass
     
+    @classmethod
+    def _ensure_writer(cls) -> asyncio.Queue:
+        """获取写入队列，必要时在当前事件循环中启动后台写入任务"""
+        loop = asyncio.get_running_loop()
+        if cls._writer_task is None or cls._writer_task.done() or cls._writer_loop_ref is not loop:
+            cls._queue = asyncio.Queue(maxsize=cls.QUEUE_MAXSIZE)
+            cls._writer_task = loop.create_task(cls._writer_loop(cls._queue))
+            cls._writer_loop_ref = loop
+        return cls._queue
+    
+    @classmethod
+    async def _writer_loop(cls, queue: asyncio.Queue):
+        """
+        后台写入任务：阻塞等待第一条，再取走队列中已就绪的记录（最多 WRITE_BATCH_SIZE 条），
+        序列化后在线程中一次 writelines，磁盘 I/O 不占用事件循环
+        """
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < cls.WRITE_BATCH_SIZE:
+                try:
+                    batch.append(queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            
+            try:
+                entries_by_path: Dict[str, list] = {}
+                for path, item, run_key in batch:
+                    entries_by_path.setdefault(path, []).append((item, run_key))
+                for path, entries in entries_by_path.items():
+                    try:
+                        lines = [fast_json.dumps(item, newline=True) for item, _ in entries]
+                        await asyncio.to_thread(cls._write_lines, path, lines)
+                    except Exception as e:
+                        utils.logger.warning(f"[JsonlStore] 批量写入失败（{len(entries)} 条）: {e}")
+                        # 未写入磁盘的笔记撤销去重登记：不计入总数，之后再遇到时仍可保存
+                        cls._seen_hashes.difference_update(
+                            _id_hash(str(item["item_id"]).encode("utf-8")) for item, _ in entries
+                        )
+                    else:
+                        # 写入成功才计入各次爬取的新增数
+                        for _, run_key in entries:
+                            if run_key is not None:
+                                cls._written_counts[run_key] = cls._written_counts.get(run_key, 0) + 1
+            finally:
+                for _ in batch:
+                    queue.task_done()
+    
+    @classmethod
+    def _write_lines(cls, path: str, lines: list):
+        """
+        写入共享描述符（首次写入或输出路径变化时以 O_APPEND 打开）
+        
+        O_APPEND 下每次写入都原子地定位到文件末尾，多个进程追加同一文件也不会互相覆盖；
+        writev 一次系统调用提交整批行，部分写入时从断点继续
+        """
+        if cls._fd is None or cls._fd_path != path:
+            cls.close()
+            flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0)
+            cls._fd = os.open(path, flags, 0o644)
+            cls._fd_path = path
+        
+        while lines:
+            written = _writev(cls._fd, lines)
+            # 部分写入：跳过已完整写出的行，截掉首个未写完行的已写部分
+            done = 0
+            while done < len(lines) and written >= len(lines[done]):
+                written -= len(lines[done])
+                done += 1
+            lines = lines[done:]
+            if lines:
+                lines[0] = lines[0][written:]
+    
+    @classmethod
+    async def drain(cls):
+        """
+        等待队列中的笔记全部写入；没有进行中的爬取时再停止后台写入任务并关闭文件
+        （并发爬取共用写入任务和文件描述符，先结束的一方不能把它们关掉）
+        """
+        if cls._queue is not None and cls._writer_loop_ref is asyncio.get_running_loop():
+            await cls._queue.join()
+        if cls._active_runs == 0:
+            cls._stop_writer()
+            cls.close()
+    
+    @classmethod
+    def pop_written_count(cls, run_key: str) -> int:
+        """取出并清除某次爬取已写入磁盘的笔记数"""
+        return cls._written_counts.pop(run_key, 0)
+    
+    @classmethod
+    def _stop_writer(cls):
+        """取消后台写入任务并丢弃队列"""
+        if cls._writer_task is not None and not cls._writer_task.done():
+            cls._writer_task.cancel()
+        cls._queue = None
+        cls._writer_task = None
+        cls._writer_loop_ref = None
+    
     def flush(self):
-        """无需 flush（实时写入）"""
-        pass
+        """兼容旧接口：写入不经过用户态缓冲，写入任务完成即已交给内核，无需额外操作"""
+    
+    @classmethod
+    def close(cls):
+        """关闭共享文件描述符"""
+        if cls._fd is not None:
+            try:
+                os.close(cls._fd)
+            except OSError as e:
+                utils.logger.warning(f"[JsonlStore] 关闭输出文件失败: {e}")
+            cls._fd = None
+            cls._fd_path = None
     
     @classmethod
     def get_total_count(cls) -> int:
         """获取已保存的总数"""
-        return len(cls._seen_ids)
+        return len(cls._seen_hashes)
     
     @classmethod
     def reset(cls):
         """重置类状态（测试用）"""
-        cls._seen_ids.clear()
+        cls._stop_writer()
+        cls.close()
+        cls._seen_hashes.clear()
         cls._instance_count = 0
+        cls._loaded_path = None
+        cls._active_runs = 0
+        cls._written_counts.clear()
+
+
+# 进程退出时关闭文件描述符
+atexit.register(JsonlStoreImplement.close)
 
 
 class XhsBasicCrawler:
@@ -237,8 +449,8 @@ class XhsBasicCrawler:
         self.append_mode = append_mode
         self.output_path = "data/raw/annotations.jsonl"
         
-        # 保存原始配置
-        self._original_config = {}
+        # 每个爬虫实例注册独立的存储选项名，并发时各自写入自己的存储
+        self._store_option = f"jsonl_custom_{id(self):x}"
     
     async def run(self) -> int:
         """
@@ -247,13 +459,13 @@ class XhsBasicCrawler:
         Returns:
             int: 本次保存的笔记数量
         """
-        start_count = JsonlStoreImplement.get_total_count()
+        # 1. 在当前上下文中覆盖配置（退出时自动失效）
+        config_token = _CONFIG_OVERRIDES.set(self._config_overrides())
+        utils.logger.info("[XhsBasicCrawler] 配置已覆盖")
+        JsonlStoreImplement._active_runs += 1
+        failed = False
         
         try:
-            # 1. 备份并覆盖配置
-            self._backup_config()
-            self._override_config()
-            
             # 2. 注入自定义存储
             self._inject_custom_store()
             
@@ -268,84 +480,70 @@ class XhsBasicCrawler:
             crawler = XiaoHongShuCrawler()
             await crawler.start()
             
-            # 4. 统计结果
-            end_count = JsonlStoreImplement.get_total_count()
-            new_count = end_count - start_count
-            
-            utils.logger.info("=" * 60)
-            utils.logger.info(f"[XhsBasicCrawler] 爬取完成")
-            utils.logger.info(f"  本次新增: {new_count} 条")
-            utils.logger.info(f"  累计总数: {end_count} 条")
-            utils.logger.info(f"  输出文件: {self.output_path}")
-            utils.logger.info("=" * 60)
-            
-            return new_count
-            
         except KeyboardInterrupt:
             utils.logger.warning("[XhsBasicCrawler] 用户中断")
             raise
         except Exception as e:
+            # 不抛出异常，返回已写入的数量
+            failed = True
             utils.logger.error(f"[XhsBasicCrawler] 爬取出错: {e}")
-            utils.logger.debug(traceback.format_exc())
-            # 返回已保存的数量，不抛出异常
-            return JsonlStoreImplement.get_total_count() - start_count
+            if utils.logger.isEnabledFor(logging.DEBUG):
+                utils.logger.debug(traceback.format_exc())
         finally:
-            # 恢复配置
-            self._restore_config()
-    
-    def _backup_config(self):
-        """备份原始配置"""
-        self._original_config = {
-            "PLATFORM": getattr(config, "PLATFORM", "xhs"),
-            "KEYWORDS": getattr(config, "KEYWORDS", ""),
-            "CRAWLER_MAX_NOTES_COUNT": getattr(config, "CRAWLER_MAX_NOTES_COUNT", 20),
-            "SAVE_DATA_OPTION": getattr(config, "SAVE_DATA_OPTION", "json"),
-            "CRAWLER_TYPE": getattr(config, "CRAWLER_TYPE", "search"),
-            "ENABLE_GET_COMMENTS": getattr(config, "ENABLE_GET_COMMENTS", True),
-            "ENABLE_GET_MEIDAS": getattr(config, "ENABLE_GET_MEIDAS", False),
-            "MAX_CONCURRENCY_NUM": getattr(config, "MAX_CONCURRENCY_NUM", 1),
-            "SAVE_LOGIN_STATE": getattr(config, "SAVE_LOGIN_STATE", True),
-        }
-    
-    def _override_config(self):
-        """覆盖为爬取所需配置"""
-        config.PLATFORM = "xhs"
-        config.KEYWORDS = self.keyword
-        config.CRAWLER_MAX_NOTES_COUNT = self.max_notes
-        config.SAVE_DATA_OPTION = "jsonl_custom"
-        config.CRAWLER_TYPE = "search"
+            # 写出队列中的笔记（写入失败的已撤销登记，不计入新增），注销存储并恢复配置
+            JsonlStoreImplement._active_runs -= 1
+            await JsonlStoreImplement.drain()
+            new_count = JsonlStoreImplement.pop_written_count(self._store_option)
+            XhsStoreFactory.STORES.pop(self._store_option, None)
+            _CONFIG_OVERRIDES.reset(config_token)
+            utils.logger.info("[XhsBasicCrawler] 配置已恢复")
         
-        # 稳定性优化
-        config.ENABLE_GET_COMMENTS = False  # 不抓评论（加速）
-        config.ENABLE_GET_MEIDAS = False    # 不下载媒体（只存URL）
-        config.MAX_CONCURRENCY_NUM = 1      # 串行执行（稳定）
-        config.SAVE_LOGIN_STATE = True      # 保存登录态
+        # 4. 统计结果（只计本次爬取写入的笔记，并发爬取互不混入）
+        if not failed:
+            utils.logger.info("=" * 60)
+            utils.logger.info(f"[XhsBasicCrawler] 爬取完成")
+            utils.logger.info(f"  本次新增: {new_count} 条")
+            utils.logger.info(f"  累计总数: {JsonlStoreImplement.get_total_count()} 条")
+            utils.logger.info(f"  输出文件: {self.output_path}")
+            utils.logger.info("=" * 60)
         
-        utils.logger.info("[XhsBasicCrawler] 配置已覆盖")
+        return new_count
     
-    def _restore_config(self):
-        """恢复原始配置"""
-        for key, value in self._original_config.items():
-            try:
-                setattr(config, key, value)
-            except Exception:
-                pass
-        utils.logger.info("[XhsBasicCrawler] 配置已恢复")
+    def _config_overrides(self) -> Dict:
+        """本次爬取所需的配置覆盖"""
+        return {
+            "PLATFORM": "xhs",
+            "KEYWORDS": self.keyword,
+            "CRAWLER_MAX_NOTES_COUNT": self.max_notes,
+            "SAVE_DATA_OPTION": self._store_option,
+            "CRAWLER_TYPE": "search",
+            
+            # 稳定性优化
+            "ENABLE_GET_COMMENTS": False,  # 不抓评论（加速）
+            "ENABLE_GET_MEIDAS": False,    # 不下载媒体（只存URL）
+            "MAX_CONCURRENCY_NUM": 1,      # 串行执行（稳定）
+            "SAVE_LOGIN_STATE": True,      # 保存登录态
+        }
     
     def _inject_custom_store(self):
         """注入自定义存储实现"""
-        XhsStoreFactory.STORES["jsonl_custom"] = lambda: JsonlStoreImplement(
+        XhsStoreFactory.STORES[self._store_option] = lambda: JsonlStoreImplement(
             output_path=self.output_path,
-            append_mode=self.append_mode
+            append_mode=self.append_mode,
+            run_key=self._store_option
         )
         utils.logger.info("[XhsBasicCrawler] 已注入 JSONL 存储")
     
     def get_saved_count(self) -> int:
-        """获取已保存的笔记总数"""
+        """
+        获取已保存的笔记总数
+        
+        本进程已初始化过存储时，去重集合即为文件中的全部笔记（含已入队待写入的），O(1) 返回；
+        否则按块统计文件行数（src.utils.lines.count_lines；文件不存在时返回 0）
+        """
+        if JsonlStoreImplement._instance_count:
+            return JsonlStoreImplement.get_total_count()
         try:
-            if not os.path.exists(self.output_path):
-                return 0
-            with open(self.output_path, "r", encoding="utf-8") as f:
-                return sum(1 for _ in f)
-        except Exception:
+            return count_lines(self.output_path)
+        except OSError:
             return 0
@@ -8,12 +8,29 @@ LLM Client - 大模型 API 调用客户端
 - 调用失败自动回退
 - 不影响现有模板引擎功能
 """
+import atexit
+import importlib.util
 import json
 import logging
+import re
+import threading
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
 
+from src.utils import jsonl as fast_json
+
 logger = logging.getLogger(__name__)
 
+# ```json ... ``` 代码块（模块加载时编译一次）
+_JSON_BLOCK_RE = re.compile(r'```json\s*(.*?)\s*```', re.DOTALL)
+
+# 从任意位置解析一个 JSON 值并返回结束下标，后面的多余文字不影响
+_RAW_DECODER = json.JSONDecoder()
+
+# 复用的 HTTP 客户端（保持长连接，避免每次调用都重新握手 TLS）
+_HTTP_CLIENT = None
+_HTTP_CLIENT_LOCK = threading.Lock()
+
 
 # Provider 配置
 PROVIDER_CONFIG = {
@@ -56,9 +73,28 @@ def build_prompt(
     Returns:
         prompt 文本
     """
-    tags_str = "、".join(top_tags[:8]) if top_tags else "无"
-    edges_str = "、".join([f"{t1}+{t2}" for t1, t2 in top_edges[:5]]) if top_edges else "无"
-    titles_str = "\n".join([f"- {t}" for t in original_titles[:3]]) if original_titles else "无"
+    # 只取实际用到的部分转为 tuple 作为缓存键：批量生成时相同输入只拼接一次
+    return _build_prompt_cached(
+        keyword,
+        tuple(top_tags[:8]) if top_tags else (),
+        tuple((t1, t2) for t1, t2 in top_edges[:5]) if top_edges else (),
+        style,
+        tuple(original_titles[:3]) if original_titles else ()
+    )
+
+
+@lru_cache(maxsize=256)
+def _build_prompt_cached(
+    keyword: str,
+    tags: Tuple[str, ...],
+    edges: Tuple[Tuple[str, str], ...],
+    style: str,
+    titles: Tuple[str, ...]
+) -> str:
+    """build_prompt 的实际拼接逻辑（纯函数，按参数缓存）"""
+    tags_str = "、".join(tags) if tags else "无"
+    edges_str = "、".join([f"{t1}+{t2}" for t1, t2 in edges]) if edges else "无"
+    titles_str = "\n".join([f"- {t}" for t in titles]) if titles else "无"
     
     prompt = f"""你是一位资深的小红书内容创作专家。请根据以下数据洞察，生成一篇高质量的小红书笔记文案。
 
@@ -105,33 +141,68 @@ def parse_llm_response(response_text: str) -> Optional[Dict]:
     Returns:
         解析后的 dict 或 None
     """
-    try:
-        # 尝试直接解析
-        return json.loads(response_text)
-    except json.JSONDecodeError:
-        pass
+    # 先看首个非空白字符判断格式，每条路径最多解析一次：
+    # 以 { 或 [ 开头才尝试整段直接解析，以 ``` 开头的代码块不再白白解析失败一次
+    head = response_text.lstrip()[:1]
+    if not head:
+        logger.warning("LLM 返回为空")
+        return None
+    
+    if head in "{[":
+        try:
+            # 尝试直接解析
+            return fast_json.loads(response_text)
+        except ValueError:
+            pass
     
     # 尝试提取 JSON 块
-    import re
-    json_match = re.search(r'```json\s*(.*?)\s*```', response_text, re.DOTALL)
+    json_match = _JSON_BLOCK_RE.search(response_text) if "```" in response_text else None
     if json_match:
         try:
-            return json.loads(json_match.group(1))
-        except json.JSONDecodeError:
+            return fast_json.loads(json_match.group(1))
+        except ValueError:
             pass
     
-    # 尝试提取 {...}
-    json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-    if json_match:
+    # 尝试提取 {...}：从第一个 { 起直接解析到与之配对的 }（C 实现的扫描器，
+    # 正确跳过字符串里的括号），不再用贪婪的 \{.*\} 匹配到全文最后一个 }
+    start = response_text.find("{")
+    if start != -1:
         try:
-            return json.loads(json_match.group(0))
-        except json.JSONDecodeError:
+            return _RAW_DECODER.raw_decode(response_text, start)[0]
+        except ValueError:
             pass
     
     logger.warning(f"无法解析 LLM 返回: {response_text[:200]}...")
     return None
 
 
+def _get_http_client():
+    """
+    获取进程内共享的 httpx 客户端（首次调用时创建，线程安全）
+    
+    安装了 h2 时启用 HTTP/2，并发请求可复用同一条连接
+    
+    Returns:
+        httpx.Client
+    """
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is None:
+        import httpx
+        
+        with _HTTP_CLIENT_LOCK:
+            if _HTTP_CLIENT is None:
+                _HTTP_CLIENT = httpx.Client(
+                    http2=importlib.util.find_spec("h2") is not None,
+                    limits=httpx.Limits(
+                        max_keepalive_connections=20,
+                        max_connections=50,
+                        keepalive_expiry=60
+                    )
+                )
+                atexit.register(_HTTP_CLIENT.close)
+    return _HTTP_CLIENT
+
+
 def call_llm_api(
     prompt: str,
     provider: str = "DeepSeek",
@@ -161,7 +232,7 @@ def call_llm_api(
     
     try:
         # 使用 httpx 直接调用（避免强制依赖 openai 包）
-        import httpx
+        client = _get_http_client()
         
         headers = {
             "Authorization": f"Bearer {api_key}",
@@ -177,16 +248,16 @@ def call_llm_api(
             "max_tokens": 1000,
         }
         
-        with httpx.Client(timeout=timeout) as client:
-            response = client.post(
-                f"{config['base_url']}/chat/completions",
-                headers=headers,
-                json=data
-            )
-            response.raise_for_status()
-            
-            result = response.json()
-            return result["choices"][0]["message"]["content"]
+        response = client.post(
+            f"{config['base_url']}/chat/completions",
+            headers=headers,
+            json=data,
+            timeout=timeout
+        )
+        response.raise_for_status()
+        
+        result = response.json()
+        return result["choices"][0]["message"]["content"]
     
     except ImportError:
         # 如果没有 httpx，尝试用 openai
@@ -8,11 +8,13 @@ Template Engine - 模板引擎
 - 结构化正文生成
 - 标签组合推荐
 """
+import os
 import random
-import json
 from typing import List, Dict, Tuple
 from datetime import datetime
 
+from src.utils import jsonl as fast_json
+
 
 class TemplateEngine:
     """模板化文案生成器"""
@@ -117,19 +119,34 @@ class TemplateEngine:
         }
     }
     
+    # 工具列表行格式（按风格预编译，{0} 为序号，{1} 为工具名）
+    TOOL_LINE_FORMATS = {
+        "清单型": "{0}. **{1}** - 核心功能简介",
+        "对比型": "{0}. **{1}** - 优点 vs 缺点",
+        "避坑型": "{0}. 关于**{1}** - 注意事项",
+        "教程型": "第{0}步：学习 **{1}**",
+    }
+    
     # 内容角度
     ANGLES = [
         "对比测评", "避坑清单", "上手教程", "效率提升", "工具组合"
     ]
     
-    def __init__(self, top_tags: List[str], top_edges: List[Tuple[str, str, float]]):
+    def __init__(
+        self,
+        top_tags: List[str],
+        top_edges: List[Tuple[str, str, float]],
+        rng: random.Random = None
+    ):
         """
         Args:
             top_tags: PageRank Top 标签列表
             top_edges: Top 共现边列表
+            rng: 随机数生成器（默认使用 random 模块，random.seed() 可复现单条与批量生成）
         """
         self.top_tags = top_tags
         self.top_edges = top_edges
+        self.rng = rng if rng is not None else random
     
     def generate_draft(
         self,
@@ -156,48 +173,110 @@ class TemplateEngine:
     
     def _generate_with_template(self, keyword: str, num_tools: int) -> Dict:
         """基于模板生成（升级版 - 4套风格轮换）"""
-        # 随机选择风格（清单/对比/避坑/教程）
-        style = random.choice(list(self.TITLE_TEMPLATES.keys()))
+        # 随机选择风格及该风格下的各段模板、角度
+        choice = self._random_choice()
+        style = choice[0]
+        tools = self._select_tools(num_tools)
+        return self._render_draft(
+            keyword, num_tools, choice, tools,
+            self._format_tools_list(style, tools),
+            self._generate_hashtags(keyword, num_tags=8),
+            datetime.now().year
+        )
+    
+    def _random_choice(self) -> Tuple[str, int, int, int, int, int]:
+        """
+        随机选择风格（清单/对比/避坑/教程）及该风格下的各段模板、角度
         
-        # 选择该风格的模板
-        title_tpl = random.choice(self.TITLE_TEMPLATES[style])
-        hook_tpl = random.choice(self.BODY_TEMPLATES[style]["hook"])
-        main_tpl = random.choice(self.BODY_TEMPLATES[style]["main"])
-        cta_tpl = random.choice(self.BODY_TEMPLATES[style]["cta"])
+        Returns:
+            (风格, 标题下标, hook 下标, main 下标, cta 下标, 角度下标)
+        """
+        rng = self.rng
+        compiled = self._compiled_styles()
+        style = rng.choice(list(compiled))
+        titles, hooks, mains, ctas, _ = compiled[style]
+        return (
+            style,
+            rng.randrange(len(titles)),
+            rng.randrange(len(hooks)),
+            rng.randrange(len(mains)),
+            rng.randrange(len(ctas)),
+            rng.randrange(len(self.ANGLES)),
+        )
+    
+    @classmethod
+    def _compiled_styles(cls) -> Dict[str, Tuple]:
+        """
+        各风格的模板预先绑定为 str.format 方法（首次调用时构建并缓存在类上）
+        
+        渲染时按风格一次取出整组模板，不再逐段查 TITLE_TEMPLATES / BODY_TEMPLATES 嵌套字典；
+        只认本类自己 __dict__ 中的缓存，子类覆盖模板时会各自构建
+        
+        Returns:
+            {风格: (标题模板, hook 模板, main 模板, cta 模板, 工具行格式)}，前四项为 tuple
+        """
+        compiled = cls.__dict__.get("_COMPILED_STYLES")
+        if compiled is None:
+            compiled = {
+                style: (
+                    tuple(tpl.format for tpl in titles),
+                    tuple(tpl.format for tpl in cls.BODY_TEMPLATES[style]["hook"]),
+                    tuple(tpl.format for tpl in cls.BODY_TEMPLATES[style]["main"]),
+                    tuple(tpl.format for tpl in cls.BODY_TEMPLATES[style]["cta"]),
+                    cls.TOOL_LINE_FORMATS[style].format,
+                )
+                for style, titles in cls.TITLE_TEMPLATES.items()
+            }
+            cls._COMPILED_STYLES = compiled
+        return compiled
+    
+    def _select_tools(self, num_tools: int) -> List[str]:
+        """取前 num_tools 个 top_tags 作为推荐工具"""
+        return self.top_tags[:num_tools] if len(self.top_tags) >= num_tools else self.top_tags
+    
+    def _format_tools_list(self, style: str, tools: List[str]) -> str:
+        """按风格的预编译行格式生成工具列表"""
+        line_format = self._compiled_styles()[style][4]
+        return "\n".join(line_format(i, tool) for i, tool in enumerate(tools, 1))
+    
+    def _render_draft(
+        self,
+        keyword: str,
+        num_tools: int,
+        choice: Tuple[str, int, int, int, int, int],
+        tools: List[str],
+        tools_list: str,
+        hashtags: List[str],
+        year: int
+    ) -> Dict:
+        """
+        按已选定的模板下标渲染草稿
         
-        # 选择角度
-        angle = random.choice(self.ANGLES)
+        Args:
+            choice: (风格, 标题下标, hook 下标, main 下标, cta 下标, 角度下标)
+            tools: 推荐工具
+            tools_list: 已格式化的工具列表
+            hashtags: 推荐标签
+            year: 标题中的年份
+        """
+        style, title_i, hook_i, main_i, cta_i, angle_i = choice
+        titles, hooks, mains, ctas, _ = self._compiled_styles()[style]
+        angle = self.ANGLES[angle_i]
         
         # 生成标题
-        title = title_tpl.format(
+        title = titles[title_i](
             count=num_tools,
             topic=keyword,
-            year=datetime.now().year
+            year=year
         )
         
-        # 生成工具列表（使用 top_tags）
-        tools = self.top_tags[:num_tools] if len(self.top_tags) >= num_tools else self.top_tags
-        
-        # 根据风格调整工具列表格式
-        if style == "清单型":
-            tools_list = "\n".join([f"{i+1}. **{tool}** - 核心功能简介" for i, tool in enumerate(tools)])
-        elif style == "对比型":
-            tools_list = "\n".join([f"{i+1}. **{tool}** - 优点 vs 缺点" for i, tool in enumerate(tools)])
-        elif style == "避坑型":
-            tools_list = "\n".join([f"{i+1}. 关于**{tool}** - 注意事项" for i, tool in enumerate(tools)])
-        else:  # 教程型
-            tools_list = "\n".join([f"第{i+1}步：学习 **{tool}**" for i, tool in enumerate(tools)])
-        
         # 生成正文（三段式）
-        hook = hook_tpl.format(topic=keyword, count=num_tools, angle=angle)
-        main = main_tpl.format(tools_list=tools_list, angle=angle)
-        cta = cta_tpl.format(topic=keyword)
+        hook = hooks[hook_i](topic=keyword, count=num_tools, angle=angle)
+        main = mains[main_i](tools_list=tools_list, angle=angle)
+        cta = ctas[cta_i](topic=keyword)
         
         body = f"{hook}\n\n{main}\n\n{cta}"
         
-        # 生成标签（从 top_edges 提取）
-        hashtags = self._generate_hashtags(keyword, num_tags=8)
-        
         return {
             "title": title,
             "body": body,
@@ -211,22 +290,19 @@ class TemplateEngine:
         }
     
     def _generate_hashtags(self, keyword: str, num_tags: int = 8) -> List[str]:
-        """生成推荐标签"""
-        tags = [keyword]  # 关键词作为首个标签
-        
-        # 添加 PageRank Top 标签
-        for tag in self.top_tags[:num_tags]:
-            if tag not in tags and tag != keyword:
-                tags.append(tag)
+        """生成推荐标签（dict 保序去重，成员判断 O(1)）"""
+        # 关键词作为首个标签，随后是 PageRank Top 标签
+        tags = dict.fromkeys([keyword, *self.top_tags[:num_tags]])
         
         # 添加边的标签
         for tag1, tag2, _ in self.top_edges[:num_tags]:
-            if tag1 not in tags and len(tags) < num_tags:
-                tags.append(tag1)
-            if tag2 not in tags and len(tags) < num_tags:
-                tags.append(tag2)
+            if len(tags) >= num_tags:
+                break
+            tags.setdefault(tag1)
+            if len(tags) < num_tags:
+                tags.setdefault(tag2)
         
-        return tags[:num_tags]
+        return list(tags)[:num_tags]
     
     def _generate_with_llm(self, keyword: str, num_tools: int) -> Dict:
         """使用 LLM 生成（预留接口）"""
@@ -234,6 +310,25 @@ class TemplateEngine:
         # 暂时返回模板版本
         return self._generate_with_template(keyword, num_tools)
     
+    @staticmethod
+    def _allocate_accounts(count: int, num_accounts: int) -> List[Tuple[int, int]]:
+        """
+        计算每条草稿所属账号及其在该账号内的序号（前 remainder 个账号各多分 1 条）
+        
+        Args:
+            count: 草稿总数
+            num_accounts: 账号数
+            
+        Returns:
+            [(账号下标, 账号内序号（从 1 开始)), ...]
+        """
+        per_account, remainder = divmod(count, num_accounts)
+        return [
+            (i, j)
+            for i in range(num_accounts)
+            for j in range(1, per_account + (1 if i < remainder else 0) + 1)
+        ]
+    
     def generate_batch(
         self,
         keyword: str,
@@ -257,18 +352,29 @@ class TemplateEngine:
             # 单账号模式
             accounts = ["主账号"]
         
-        # 计算每个账号的草稿数
-        per_account = count // len(accounts)
-        remainder = count % len(accounts)
+        # 与单条生成使用同一随机源抽取风格与模板下标
+        num_drafts = max(count, 0)
+        choices = [self._random_choice() for _ in range(num_drafts)]
         
-        for i, account in enumerate(accounts):
-            account_count = per_account + (1 if i < remainder else 0)
-            
-            for j in range(account_count):
-                draft = self.generate_draft(keyword, num_tools=5)
-                draft["account"] = account
-                draft["draft_id"] = f"{account}_{j+1}"
-                drafts.append(draft)
+        # 工具、工具列表、标签、年份在整批内不变，只计算一次
+        num_tools = 5
+        tools = self._select_tools(num_tools)
+        tools_lists = {s: self._format_tools_list(s, tools) for s in self._compiled_styles()}
+        hashtags = self._generate_hashtags(keyword, num_tags=8)
+        year = datetime.now().year
+        
+        # 按账号顺序分配草稿：前 remainder 个账号各多分 1 条
+        slots = self._allocate_accounts(num_drafts, len(accounts))
+        
+        for choice, (a, j) in zip(choices, slots):
+            account = accounts[a]
+            draft = self._render_draft(
+                keyword, num_tools, choice, list(tools),
+                tools_lists[choice[0]], list(hashtags), year
+            )
+            draft["account"] = account
+            draft["draft_id"] = f"{account}_{j}"
+            drafts.append(draft)
         
         return drafts
 
@@ -298,9 +404,8 @@ def save_drafts_package(
     
     # 1. 保存 drafts.jsonl
     drafts_file = os.path.join(package_path, "drafts.jsonl")
-    with open(drafts_file, "w", encoding="utf-8") as f:
-        for draft in drafts:
-            f.write(json.dumps(draft, ensure_ascii=False) + "\n")
+    with open(drafts_file, "wb") as f:
+        f.writelines(fast_json.dumps(draft, newline=True) for draft in drafts)
     
     # 2. 生成 README.txt
     readme_content = f"""# 草稿包说明
@@ -8,12 +8,41 @@ Graph Analytics - Stage 3
 - Rising Edges 趋势边发现
 - 时间窗口分析
 """
-import json
 import networkx as nx
+import numpy as np
 from datetime import datetime, timedelta
-from typing import List, Dict, Tuple
-from collections import Counter
-from itertools import combinations
+from typing import List, Dict, Optional, Tuple
+from itertools import chain
+
+from src.graph.builder import pair_keys
+from src.graph.pagerank import fast_pagerank
+from src.utils import jsonl as fast_json
+from src.utils.topk import top_k_indices
+
+
+def parse_item_time(time_str) -> Optional[datetime]:
+    """
+    解析笔记时间
+    
+    Python 3.11+ 的 fromisoformat 直接支持空格分隔和 Z 后缀，常见格式一次解析成功，
+    不再每条先做两次字符串替换；失败时再按旧逻辑替换后重试
+    
+    Args:
+        time_str: 时间字符串
+    
+    Returns:
+        datetime 或 None（为空或无法解析）
+    """
+    if not time_str:
+        return None
+    try:
+        return datetime.fromisoformat(time_str)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return datetime.fromisoformat(time_str.replace('Z', '+00:00').replace(' ', 'T'))
+    except Exception:
+        return None
 
 
 class GraphAnalytics:
@@ -28,49 +57,84 @@ class GraphAnalytics:
         self.graph = graph
         self.data_path = data_path
         self.items = []
+        self.pagerank_scores = {}  # 最近一次 PageRank 的完整分数（可作为下次计算的初始向量）
+        
+        # 标签对缓存（由 _prepare_pairs 按 self.items 生成，items 被重新赋值后自动重建）
+        self._pairs_source = None
+        self._tag_list: List[str] = []
+        self._item_times: List[datetime] = []  # 所有有效时间（含标签数 < 2 的笔记）
+        self._row_times = np.empty(0, dtype=object)  # 每行（标签数 >= 2 的笔记）的时间，无效为 None
+        self._pair_rows = np.empty(0, dtype=np.int64)  # 每个标签对所属的行
+        self._pair_edges = np.empty(0, dtype=np.int64)  # 每个标签对的边编号
+        self._edge_keys = np.empty(0, dtype=np.int64)  # 边编号 -> 标签对键（见 builder.pair_keys）
     
     def load_data(self):
         """加载数据"""
         try:
-            with open(self.data_path, "r", encoding="utf-8") as f:
-                self.items = [json.loads(line.strip()) for line in f]
+            with open(self.data_path, "rb") as f:
+                self.items = [fast_json.loads(line) for line in f if not line.isspace()]
         except FileNotFoundError:
             print(f"❌ 文件不存在: {self.data_path}")
             self.items = []
     
-    def compute_pagerank(self, top_n: int = 15) -> List[Tuple[str, float]]:
+    def compute_pagerank(
+        self,
+        top_n: int = 15,
+        nstart: Dict[str, float] = None,
+        verbose: bool = False
+    ) -> List[Tuple[str, float]]:
         """
         计算 PageRank 分数
         
         Args:
             top_n: 返回 Top N 标签
+            nstart: 初始分数向量（可选）。传入上一次的结果可在图增量变化时加快收敛；
+                不传时沿用本实例上一次的计算结果
+            verbose: 是否打印过程和 Top N 结果（默认不输出，计算本身无 I/O）
             
         Returns:
             [(tag, pagerank_score), ...]
         """
         if not self.graph or not self.graph.nodes:
-            print("⚠️  图为空，无法计算 PageRank")
+            if verbose:
+                print("⚠️  图为空，无法计算 PageRank")
             return []
         
-        print("📊 计算 PageRank...")
+        if verbose:
+            print("📊 计算 PageRank...")
+        
+        # 热启动：仍在图中的节点沿用上次分数，新节点按 1/n 补齐（fast_pagerank 内部做 L1 归一化）；
+        # 与新图没有交集时从均匀分布开始
+        if nstart is None:
+            nstart = self.pagerank_scores
+        if nstart and not nstart.keys().isdisjoint(self.graph.nodes):
+            uniform = 1.0 / self.graph.number_of_nodes()
+            nstart = {node: nstart.get(node, uniform) for node in self.graph}
+        else:
+            nstart = None
         
         # 计算 PageRank（考虑边权重）
-        pagerank_scores = nx.pagerank(self.graph, weight="weight")
+        pagerank_scores = fast_pagerank(self.graph, weight="weight", nstart=nstart)
+        self.pagerank_scores = pagerank_scores
         
-        # 排序
-        ranked = sorted(pagerank_scores.items(), key=lambda x: x[1], reverse=True)
+        # 只取 Top N（线性时间的部分选择，同分顺序与完整排序一致）
+        tags = list(pagerank_scores)
+        scores = np.fromiter(pagerank_scores.values(), dtype=float, count=len(tags))
+        ranked = [(tags[i], pagerank_scores[tags[i]]) for i in top_k_indices(scores, top_n)]
         
-        print(f"✅ PageRank Top {top_n}:")
-        for i, (tag, score) in enumerate(ranked[:top_n], 1):
-            print(f"  {i}. {tag}: {score:.4f}")
+        if verbose:
+            print(f"✅ PageRank Top {top_n}:")
+            for i, (tag, score) in enumerate(ranked, 1):
+                print(f"  {i}. {tag}: {score:.4f}")
         
-        return ranked[:top_n]
+        return ranked
     
     def find_rising_edges(
         self,
         recent_days: int = 7,
         historical_days: int = 30,
-        top_n: int = 10
+        top_n: int = 10,
+        verbose: bool = False
     ) -> Tuple[List[Tuple[str, str, float, dict]], Dict]:
         """
         发现趋势边（Rising Edges）- 增强版
@@ -84,6 +148,7 @@ class GraphAnalytics:
             recent_days: 最近窗口（天）
             historical_days: 历史窗口（天）
             top_n: 返回 Top N 趋势边
+            verbose: 是否打印窗口信息和结果（默认不输出，计算本身无 I/O）
             
         Returns:
             (edges, window_stats)
@@ -93,151 +158,202 @@ class GraphAnalytics:
         if not self.items:
             self.load_data()
         
-        print("=" * 60)
-        print("🔥 发现趋势边（Rising Edges - Enhanced）")
-        print("=" * 60)
+        if verbose:
+            print("=" * 60)
+            print("🔥 发现趋势边（Rising Edges - Enhanced）")
+            print("=" * 60)
         
-        # 解析时间并找到最大时间（基准时间 anchor_now）
-        items_with_time = []
-        for item in self.items:
-            time_str = item.get("time")
-            if not time_str:
-                continue
-            
-            try:
-                # 支持多种时间格式
-                time_obj = datetime.fromisoformat(time_str.replace('Z', '+00:00').replace(' ', 'T'))
-                items_with_time.append((item, time_obj))
-            except Exception:
-                continue
+        self._prepare_pairs()
         
         # 非空 fallback：如果无有效时间数据，返回全局 Top Edges
-        if not items_with_time:
-            print("⚠️  无有效时间数据，使用 Fallback: Top Co-occurrence Edges")
-            return self._fallback_top_edges(top_n)
+        if not self._item_times:
+            if verbose:
+                print("⚠️  无有效时间数据，使用 Fallback: Top Co-occurrence Edges")
+            return self._fallback_top_edges(top_n, verbose=verbose)
         
         # 基准时间：数据中的最大时间（anchor_now）
-        anchor_now = max(t for _, t in items_with_time)
+        anchor_now = max(self._item_times)
         recent_threshold = anchor_now - timedelta(days=recent_days)
         historical_threshold = anchor_now - timedelta(days=recent_days + historical_days)
         
-        print(f"📅 Anchor Now (数据最大时间): {anchor_now.strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"  Recent window: [{recent_threshold.strftime('%Y-%m-%d')} ~ {anchor_now.strftime('%Y-%m-%d')}]")
-        print(f"  Historical window: [{historical_threshold.strftime('%Y-%m-%d')} ~ {recent_threshold.strftime('%Y-%m-%d')}]")
+        if verbose:
+            print(f"📅 Anchor Now (数据最大时间): {anchor_now.strftime('%Y-%m-%d %H:%M:%S')}")
+            print(f"  Recent window: [{recent_threshold.strftime('%Y-%m-%d')} ~ {anchor_now.strftime('%Y-%m-%d')}]")
+            print(f"  Historical window: [{historical_threshold.strftime('%Y-%m-%d')} ~ {recent_threshold.strftime('%Y-%m-%d')}]")
         
-        # 分窗口统计边权重
-        recent_edges = Counter()
-        historical_edges = Counter()
-        recent_items = []
-        historical_items = []
-        all_edges = Counter()  # 全局边（用于 fallback）
+        # 时间窗口分类（按行）：0=recent, 1=historical, 2=更早, 3=无有效时间（不参与统计）；
+        # 时间为对象数组，比较逐元素调用 datetime 比较，语义与逐条判断相同
+        timed = np.flatnonzero(np.not_equal(self._row_times, None))
+        times = self._row_times[timed]
+        row_windows = np.full(len(self._row_times), 3, dtype=np.int8)
+        row_windows[timed] = np.where(times >= recent_threshold, 0, np.where(times >= historical_threshold, 1, 2))
         
-        for item, time_obj in items_with_time:
-            tags = item.get("tags", [])
-            if len(tags) < 2:
-                continue
-            
-            # 生成标签对
-            tag_pairs = list(combinations(sorted(tags), 2))
-            
-            # 全局统计（fallback 用）
-            for pair in tag_pairs:
-                all_edges[pair] += 1
-            
-            # 时间窗口分类
-            if time_obj >= recent_threshold:
-                for pair in tag_pairs:
-                    recent_edges[pair] += 1
-                recent_items.append(item)
-            elif time_obj >= historical_threshold:
-                for pair in tag_pairs:
-                    historical_edges[pair] += 1
-                historical_items.append(item)
+        # 分窗口统计边权重：各标签对按所属行取窗口标签，按窗口掩码做 bincount
+        windows = row_windows[self._pair_rows]
+        n_edges = len(self._edge_keys)
+        recent_mask = windows == 0
+        historical_mask = windows == 1
+        recent_cnt = np.bincount(self._pair_edges[recent_mask], minlength=n_edges)
+        hist_cnt = np.bincount(self._pair_edges[historical_mask], minlength=n_edges)
         
         window_stats = {
             "anchor_now": anchor_now.strftime('%Y-%m-%d %H:%M:%S'),
-            "recent_count": len(recent_items),
-            "historical_count": len(historical_items),
-            "total_count": len(items_with_time),
-            "recent_edges_count": len(recent_edges),
-            "historical_edges_count": len(historical_edges),
+            "recent_count": int(np.count_nonzero(row_windows == 0)),
+            "historical_count": int(np.count_nonzero(row_windows == 1)),
+            "total_count": len(self._item_times),
+            "recent_edges_count": int(np.count_nonzero(recent_cnt)),
+            "historical_edges_count": int(np.count_nonzero(hist_cnt)),
             "mode": "rising"  # 默认模式
         }
         
-        print(f"  Recent 样本数: {window_stats['recent_count']}")
-        print(f"  Historical 样本数: {window_stats['historical_count']}")
+        if verbose:
+            print(f"  Recent 样本数: {window_stats['recent_count']}")
+            print(f"  Historical 样本数: {window_stats['historical_count']}")
         
-        # 非空保证：如果任一窗口样本 < 5，使用 fallback
+        # 非空保证：如果任一窗口样本 < 5，使用 fallback（只统计有有效时间的笔记）
         if window_stats["recent_count"] < 5 or window_stats["historical_count"] < 5:
-            print(f"⚠️  窗口样本不足（Recent: {window_stats['recent_count']}, Historical: {window_stats['historical_count']}）")
-            print("  使用 Fallback: Top Co-occurrence Edges")
+            if verbose:
+                print(f"⚠️  窗口样本不足（Recent: {window_stats['recent_count']}, Historical: {window_stats['historical_count']}）")
+                print("  使用 Fallback: Top Co-occurrence Edges")
+            window_stats["mode"] = "fallback"
+            return self._fallback_top_edges(top_n, self._top_pairs(top_n, windows != 3), window_stats, verbose)
+        
+        # 计算 Rising Edges：候选边按 recent 窗口首次出现顺序，再接仅出现在 historical 的边
+        recent_order = self._first_seen(self._pair_edges[recent_mask])
+        hist_order = self._first_seen(self._pair_edges[historical_mask])
+        edges = np.concatenate((recent_order, hist_order[recent_cnt[hist_order] == 0]))
+        recent_cnt = recent_cnt[edges]
+        hist_cnt = hist_cnt[edges]
+        
+        # 增长率计算
+        growth = (recent_cnt - hist_cnt) / (hist_cnt + 1)
+        
+        # 只保留有增长的边
+        keep = np.flatnonzero((growth > 0) & (recent_cnt >= 2))
+        
+        # 非空保证：如果没有 rising edges，fallback
+        if keep.size == 0:
+            if verbose:
+                print("  无明显增长边，使用 Fallback: Top Co-occurrence Edges")
             window_stats["mode"] = "fallback"
-            return self._fallback_top_edges(top_n, all_edges, window_stats)
+            return self._fallback_top_edges(top_n, self._top_pairs(top_n, windows != 3), window_stats, verbose)
         
-        # 计算 Rising Edges
+        # 只对 Top N 组装结果（部分选择，同分保持原顺序）
         rising_edges = []
-        for edge in set(list(recent_edges.keys()) + list(historical_edges.keys())):
-            recent_weight = recent_edges.get(edge, 0)
-            historical_weight = historical_edges.get(edge, 0)
+        for i in keep[top_k_indices(growth[keep], top_n)]:
+            details = {
+                "recent_count": int(recent_cnt[i]),
+                "historical_count": int(hist_cnt[i]),
+                "growth_rate": float(growth[i])
+            }
+            rising_edges.append((*self._decode_edge(edges[i]), float(growth[i]), details))
+        
+        if verbose:
+            print(f"\n🔥 Top {top_n} Rising Edges:")
+            for i, (tag1, tag2, growth, details) in enumerate(rising_edges, 1):
+                print(f"  {i}. {tag1} ↔ {tag2}: +{growth*100:.1f}% (R:{details['recent_count']} H:{details['historical_count']})")
             
-            # 增长率计算
-            growth = (recent_weight - historical_weight) / (historical_weight + 1)
+            print("=" * 60)
+        
+        return rising_edges, window_stats
+    
+    def _prepare_pairs(self):
+        """
+        一次性解析时间并枚举所有笔记的标签对，供 find_rising_edges / _fallback_top_edges 复用
+        
+        标签按字典序编号，每条笔记（标签数 >= 2）为一行，标签对按行拼接为 int64 键，
+        再用一次 np.unique 映射为边编号；self.items 未被重新赋值时直接返回
+        """
+        if self._pairs_source is self.items:
+            return
+        
+        tag_list = sorted({tag for item in self.items for tag in item.get("tags", [])})
+        tag_index = {tag: i for i, tag in enumerate(tag_list)}
+        
+        item_times = []
+        rows = []
+        row_times = []
+        for item in self.items:
+            time_obj = parse_item_time(item.get("time"))
+            if time_obj is not None:
+                item_times.append(time_obj)
             
-            # 只保留有增长的边
-            if growth > 0 and recent_weight >= 2:
-                details = {
-                    "recent_count": recent_weight,
-                    "historical_count": historical_weight,
-                    "growth_rate": growth
-                }
-                rising_edges.append((edge[0], edge[1], growth, details))
-        
-        # 排序
-        rising_edges.sort(key=lambda x: x[2], reverse=True)
+            tags = item.get("tags", [])
+            if len(tags) < 2:
+                continue
+            
+            # 编号有序，标签对等价于 combinations(sorted(tags), 2)
+            rows.append(sorted(map(tag_index.__getitem__, tags)))
+            row_times.append(time_obj)
         
-        # 非空保证：如果没有 rising edges，fallback
-        if not rising_edges:
-            print("  无明显增长边，使用 Fallback: Top Co-occurrence Edges")
-            window_stats["mode"] = "fallback"
-            return self._fallback_top_edges(top_n, all_edges, window_stats)
+        flat = np.fromiter(chain.from_iterable(rows), dtype=np.int64)
+        lengths = np.fromiter(map(len, rows), dtype=np.int64, count=len(rows))
+        edge_keys, pair_edges = np.unique(pair_keys(flat, lengths), return_inverse=True)
         
-        print(f"\n🔥 Top {top_n} Rising Edges:")
-        for i, (tag1, tag2, growth, details) in enumerate(rising_edges[:top_n], 1):
-            print(f"  {i}. {tag1} ↔ {tag2}: +{growth*100:.1f}% (R:{details['recent_count']} H:{details['historical_count']})")
+        self._tag_list = tag_list
+        self._item_times = item_times
+        self._row_times = np.empty(len(row_times), dtype=object)
+        self._row_times[:] = row_times
+        self._pair_rows = np.repeat(np.arange(len(rows)), lengths * (lengths - 1) // 2)
+        self._pair_edges = pair_edges.ravel()
+        self._edge_keys = edge_keys
+        self._pairs_source = self.items
+    
+    def _decode_edge(self, edge: int) -> Tuple[str, str]:
+        """边编号 -> (tag1, tag2)"""
+        key = int(self._edge_keys[edge])
+        return self._tag_list[key >> 32], self._tag_list[key & 0xFFFFFFFF]
+    
+    def _top_pairs(self, top_n: int, mask: np.ndarray = None) -> List[Tuple[str, str, int]]:
+        """
+        统计 Top N 共现边（同频保持首次出现顺序，与 Counter.most_common 一致）
         
-        print("=" * 60)
+        Args:
+            top_n: 返回数量
+            mask: 参与统计的标签对掩码（可选，默认全部）
         
-        return rising_edges[:top_n], window_stats
+        Returns:
+            [(tag1, tag2, count), ...]（按共现次数降序）
+        """
+        edge_ids = self._pair_edges if mask is None else self._pair_edges[mask]
+        total_cnt = np.bincount(edge_ids, minlength=len(self._edge_keys))
+        order = self._first_seen(edge_ids)
+        top = order[top_k_indices(total_cnt[order], top_n)]
+        return [(*self._decode_edge(e), int(total_cnt[e])) for e in top]
+    
+    @staticmethod
+    def _first_seen(edge_ids: np.ndarray) -> np.ndarray:
+        """按首次出现顺序返回去重后的边编号"""
+        unique_ids, first_pos = np.unique(edge_ids, return_index=True)
+        return unique_ids[np.argsort(first_pos, kind="stable")]
     
     def _fallback_top_edges(
         self, 
         top_n: int,
-        all_edges: Counter = None,
-        window_stats: dict = None
+        top_pairs: List[Tuple[str, str, int]] = None,
+        window_stats: dict = None,
+        verbose: bool = False
     ) -> Tuple[List[Tuple[str, str, float, dict]], Dict]:
         """
         Fallback: 返回全局共现频率最高的边
         
         Args:
             top_n: 返回数量
-            all_edges: 全局边统计（可选）
+            top_pairs: 已按共现次数降序排好的 [(tag1, tag2, count), ...]（可选，默认统计全部笔记）
             window_stats: 窗口统计（可选）
+            verbose: 是否打印结果
             
         Returns:
             (edges, stats)
         """
-        if all_edges is None:
-            # 重新统计全局边
-            all_edges = Counter()
-            for item in self.items:
-                tags = item.get("tags", [])
-                if len(tags) >= 2:
-                    for pair in combinations(sorted(tags), 2):
-                        all_edges[pair] += 1
+        if top_pairs is None:
+            # 全局边（复用预先枚举的标签对）
+            self._prepare_pairs()
+            top_pairs = self._top_pairs(top_n)
         
         # 转换为统一格式
         top_edges = []
-        for (tag1, tag2), count in all_edges.most_common(top_n):
+        for tag1, tag2, count in top_pairs[:top_n]:
             details = {
                 "total_count": count,
                 "fallback_reason": "insufficient_window_samples"
@@ -253,9 +369,10 @@ class GraphAnalytics:
                 "mode": "fallback"
             }
         
-        print(f"\n📊 Fallback: Top {top_n} Co-occurrence Edges:")
-        for i, (tag1, tag2, _, details) in enumerate(top_edges[:top_n], 1):
-            print(f"  {i}. {tag1} ↔ {tag2}: 共现 {details['total_count']} 次")
+        if verbose:
+            print(f"\n📊 Fallback: Top {top_n} Co-occurrence Edges:")
+            for i, (tag1, tag2, _, details) in enumerate(top_edges[:top_n], 1):
+                print(f"  {i}. {tag1} ↔ {tag2}: 共现 {details['total_count']} 次")
         
         return top_edges, window_stats
 
@@ -272,13 +389,14 @@ def main():
     analytics = GraphAnalytics(graph)
     
     # PageRank
-    pagerank_top = analytics.compute_pagerank(top_n=10)
+    pagerank_top = analytics.compute_pagerank(top_n=10, verbose=True)
     
     # Rising Edges
     rising_edges, stats = analytics.find_rising_edges(
         recent_days=7,
         historical_days=30,
-        top_n=10
+        top_n=10,
+        verbose=True
     )
 
 
@@ -9,11 +9,108 @@ Graph Builder - Stage 3
 - 边：共现关系
 - 权重：共现频率
 """
-import json
 import networkx as nx
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
 from typing import List, Dict, Tuple
-from itertools import combinations
-from collections import Counter
+from itertools import chain
+
+from src.utils import jsonl as fast_json
+from src.utils.topk import top_k_indices
+
+
+# 可选：Numba 编译的标签对枚举，未安装时使用 NumPy 分桶实现
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _pair_keys_numba(flat, offsets):
+        """
+        逐行枚举标签对并编码为 (u << 32) | v，按出现顺序写入一个数组
+        
+        与 itertools.combinations 的顺序相同；纯整数循环，编译后不经过解释器
+        """
+        total = 0
+        for r in range(len(offsets) - 1):
+            k = offsets[r + 1] - offsets[r]
+            total += k * (k - 1) // 2
+        
+        keys = np.empty(total, dtype=np.int64)
+        p = 0
+        for r in range(len(offsets) - 1):
+            for a in range(offsets[r], offsets[r + 1]):
+                for b in range(a + 1, offsets[r + 1]):
+                    keys[p] = (flat[a] << 32) | flat[b]
+                    p += 1
+        return keys
+
+
+def _pair_keys_numpy(flat: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """
+    按行长度分桶枚举标签对：同长度的行堆成二维数组，用 np.triu_indices 一次取出全部标签对，
+    再按全局序号放回原始顺序（与 _pair_keys_numba 结果相同）
+    """
+    starts = np.cumsum(lengths) - lengths          # 每行在 flat 中的起点
+    num_pairs = lengths * (lengths - 1) // 2
+    offsets = np.cumsum(num_pairs) - num_pairs     # 每行第一个标签对的全局序号
+    
+    keys = np.empty(int(num_pairs.sum()), dtype=np.int64)
+    for k in np.unique(lengths[lengths >= 2]).tolist():
+        selected = np.flatnonzero(lengths == k)
+        block = flat[starts[selected][:, None] + np.arange(k)]
+        left, right = np.triu_indices(k, 1)
+        positions = offsets[selected][:, None] + np.arange(len(left))
+        keys[positions.ravel()] = ((block[:, left] << 32) | block[:, right]).ravel()
+    return keys
+
+
+def pair_keys(flat: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """
+    枚举每行的标签对并编码为 int64 键 (u << 32) | v
+    
+    顺序与逐行 itertools.combinations 相同；安装 Numba 时由编译后的循环枚举，否则用 NumPy 分桶
+    
+    Args:
+        flat: 所有笔记的标签 id 依次拼接（每条笔记内已排序）
+        lengths: 每条笔记的标签数
+    
+    Returns:
+        键数组（长度为各行 k * (k - 1) / 2 之和）
+    """
+    if NUMBA_AVAILABLE:
+        offsets = np.concatenate(([0], np.cumsum(lengths)))
+        return _pair_keys_numba(flat, offsets)
+    return _pair_keys_numpy(flat, lengths)
+
+
+def count_cooccurrences(flat: np.ndarray, lengths: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    统计标签对共现次数
+    
+    每行的标签对由 pair_keys 编码为 int64 键，再用 np.unique 计数。
+    结果按每个标签对首次出现的位置排序，与逐行 Counter 累加时的插入顺序一致
+    （图的邻接顺序因此不变，PageRank 等结果逐位相同）。
+    
+    Args:
+        flat: 所有笔记的标签 id 依次拼接（每条笔记内已按标签排序）
+        lengths: 每条笔记的标签数
+    
+    Returns:
+        (u, v, count) 三个等长数组
+    """
+    keys = pair_keys(flat, lengths)
+    
+    # np.unique 的 first 为首次出现位置，按它排序即恢复插入顺序
+    unique_keys, first, counts = np.unique(keys, return_index=True, return_counts=True)
+    order = np.argsort(first)
+    unique_keys = unique_keys[order]
+    return unique_keys >> 32, unique_keys & 0xFFFFFFFF, counts[order]
 
 
 class TagCooccurrenceGraph:
@@ -28,6 +125,13 @@ class TagCooccurrenceGraph:
         self.graph = nx.Graph()
         self.items = []
         
+        # 数组（SoA）形式的同一张图，build_graph 时直接由计数结果填充；
+        # nx.Graph 保留给 GEXF 导出与下游分析
+        self.nodes: List[str] = []  # 标签，下标即节点编号
+        self.node_weights = np.zeros(0, dtype=np.int64)  # 标签出现次数
+        self.edges = (np.zeros(0, dtype=np.int64),) * 3  # (u, v, weight)，u <= v，顺序与 graph.edges 相同
+        self.csr = sp.csr_array((0, 0), dtype=np.int64)  # 对称邻接矩阵（权重 = 共现次数）
+        
         # 统计信息
         self.stats = {
             "total_items": 0,
@@ -38,12 +142,9 @@ class TagCooccurrenceGraph:
     
     def load_data(self) -> List[Dict]:
         """加载清洗后的数据"""
-        items = []
-        
         try:
-            with open(self.data_path, "r", encoding="utf-8") as f:
-                for line in f:
-                    items.append(json.loads(line.strip()))
+            with open(self.data_path, "rb") as f:
+                items = [fast_json.loads(line) for line in f if not line.isspace()]
         except FileNotFoundError:
             print(f"❌ 文件不存在: {self.data_path}")
             return []
@@ -74,30 +175,48 @@ class TagCooccurrenceGraph:
         if not self.items:
             self.load_data()
         
-        # 统计边权重（共现次数）
-        edge_weights = Counter()
-        node_occurrences = Counter()
+        # 标签按首次出现顺序编号，每条笔记转为排序后的标签 id 列表
+        tag_ids: Dict[str, int] = {}
+        rows = []
         
         for item in self.items:
             tags = item.get("tags", [])
             if not tags or len(tags) < 2:
                 continue
             
-            # 统计节点出现次数
             for tag in tags:
-                node_occurrences[tag] += 1
-            
-            # 生成标签对（共现边）
-            for tag1, tag2 in combinations(sorted(tags), 2):
-                edge_weights[(tag1, tag2)] += 1
+                tag_ids.setdefault(tag, len(tag_ids))
+            rows.append([tag_ids[tag] for tag in sorted(tags)])
+        
+        id_to_tag = list(tag_ids)
+        flat = np.fromiter(chain.from_iterable(rows), dtype=np.int64)
+        lengths = np.fromiter(map(len, rows), dtype=np.int64, count=len(rows))
         
-        # 添加节点
-        for tag, count in node_occurrences.items():
-            self.graph.add_node(tag, weight=count)
+        # 添加节点（出现次数：对全部标签 id 做 bincount）
+        node_occurrences = np.bincount(flat, minlength=len(id_to_tag))
+        self.graph.add_nodes_from(
+            (tag, {"weight": count}) for tag, count in zip(id_to_tag, node_occurrences.tolist())
+        )
         
-        # 添加边
-        for (tag1, tag2), weight in edge_weights.items():
-            self.graph.add_edge(tag1, tag2, weight=weight)
+        # 添加边（权重 = 共现次数）
+        u, v, weights = count_cooccurrences(flat, lengths)
+        self.graph.add_weighted_edges_from(
+            (id_to_tag[i], id_to_tag[j], w) for i, j, w in zip(u.tolist(), v.tolist(), weights.tolist())
+        )
+        
+        # 数组形式：按较小端点稳定排序，边的顺序和方向与 graph.edges 的遍历一致
+        lo = np.minimum(u, v)
+        hi = np.maximum(u, v)
+        order = np.argsort(lo, kind="stable")
+        self.nodes = id_to_tag
+        self.node_weights = node_occurrences
+        self.edges = (lo[order], hi[order], weights[order])
+        off_diag = u != v
+        self.csr = sp.csr_array(
+            (np.concatenate((weights, weights[off_diag])),
+             (np.concatenate((u, v[off_diag])), np.concatenate((v, u[off_diag])))),
+            shape=(len(id_to_tag), len(id_to_tag))
+        )
         
         # 更新统计
         self.stats["total_tags"] = self.graph.number_of_nodes()
@@ -120,14 +239,12 @@ class TagCooccurrenceGraph:
         Returns:
             [(tag, frequency), ...]
         """
-        if not self.graph.nodes:
+        if not self.nodes:
             return []
         
-        node_weights = [(node, data.get("weight", 0)) 
-                        for node, data in self.graph.nodes(data=True)]
-        node_weights.sort(key=lambda x: x[1], reverse=True)
-        
-        return node_weights[:n]
+        # 部分选择（同频保持节点插入顺序，与稳定排序结果一致）
+        top = top_k_indices(self.node_weights, n)
+        return [(self.nodes[i], int(self.node_weights[i])) for i in top]
     
     def get_top_edges(self, n: int = 10) -> List[Tuple[str, str, int]]:
         """
@@ -139,31 +256,32 @@ class TagCooccurrenceGraph:
         Returns:
             [(tag1, tag2, weight), ...]
         """
-        if not self.graph.edges:
+        u, v, weights = self.edges
+        if not weights.size:
             return []
         
-        edges_with_weights = [(u, v, data.get("weight", 0)) 
-                              for u, v, data in self.graph.edges(data=True)]
-        edges_with_weights.sort(key=lambda x: x[2], reverse=True)
-        
-        return edges_with_weights[:n]
+        top = top_k_indices(weights, n)
+        return [(self.nodes[u[i]], self.nodes[v[i]], int(weights[i])) for i in top]
     
     def get_graph_stats(self) -> Dict:
         """获取图的统计信息"""
-        if not self.graph:
+        n = len(self.nodes)
+        if not n:
             return self.stats
         
         # 计算连通分量
-        num_components = nx.number_connected_components(self.graph)
+        num_components, _ = connected_components(self.csr, directed=False)
         
-        # 计算平均度
-        degrees = [deg for node, deg in self.graph.degree()]
-        avg_degree = sum(degrees) / len(degrees) if degrees else 0
+        # 计算平均度（与 NetworkX 一致：自环计 2）
+        u, v, _ = self.edges
+        num_edges = len(u)
+        degrees = np.diff(self.csr.indptr) + np.bincount(u[u == v], minlength=n)
+        avg_degree = float(degrees.sum() / n)
         
         self.stats.update({
-            "num_components": num_components,
+            "num_components": int(num_components),
             "avg_degree": avg_degree,
-            "density": nx.density(self.graph)
+            "density": 2 * num_edges / (n * (n - 1)) if n > 1 else 0
         })
         
         return self.stats
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+PageRank - Stage 3
+基于 SciPy CSR 稀疏矩阵的 PageRank 幂迭代
+
+与 networkx.pagerank 的语义一致（带权、悬挂节点均匀分配、L1 收敛判据），
+但直接从边列表构建 CSR 矩阵，省去 NetworkX 的图转换开销，
+每轮迭代只做一次 CSR 稀疏矩阵-向量乘法（大图且安装 Numba 时按行分区多线程执行，并与标量更新融合）。
+"""
+import networkx as nx
+import numpy as np
+import scipy.sparse as sp
+from typing import Dict
+
+# 可选：Numba 多线程 SpMV，未安装时使用 SciPy 单线程实现
+try:
+    from numba import get_num_threads, njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# 节点数达到该规模时才启用多线程 SpMV，小图的线程调度开销大于收益
+PARALLEL_MIN_NODES = 100000
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def _pagerank_step_parallel(indptr, indices, data, x, shift, alpha, teleport):
+        """
+        按目标节点（行）切分的并行 PageRank 单步迭代：y = alpha * (M.T @ x + shift) + teleport
+        
+        每个线程只写自己负责的 y[i]，无写冲突；SpMV 与后续的标量运算融合在同一趟里完成，
+        不再额外遍历三次向量。行内按下标顺序累加、运算顺序与 SciPy 路径相同，结果逐位一致
+        """
+        n = len(indptr) - 1
+        y = np.empty(n)
+        for i in prange(n):
+            total = 0.0
+            for k in range(indptr[i], indptr[i + 1]):
+                total += data[k] * x[indices[k]]
+            y[i] = (total + shift) * alpha + teleport
+        return y
+
+
+def fast_pagerank(
+    graph: nx.Graph,
+    alpha: float = 0.85,
+    tol: float = 1.0e-6,
+    max_iter: int = 100,
+    weight: str = "weight",
+    nstart: Dict = None
+) -> Dict:
+    """
+    计算 PageRank 分数
+
+    Args:
+        graph: NetworkX 图（无向图按双向边处理）
+        alpha: 阻尼系数
+        tol: 收敛阈值（与 networkx 相同：L1 误差 < N * tol）
+        max_iter: 最大迭代次数
+        weight: 边权重属性名（缺失时按 1 处理）
+        nstart: 初始分数向量（可选）
+
+    Returns:
+        {node: score}
+    """
+    n = graph.number_of_nodes()
+    if n == 0:
+        return {}
+
+    nodes = list(graph)
+    index = {node: i for i, node in enumerate(nodes)}
+
+    rows = []
+    cols = []
+    data = []
+    directed = graph.is_directed()
+    for u, v, w in graph.edges(data=weight, default=1.0):
+        i, j = index[u], index[v]
+        rows.append(i)
+        cols.append(j)
+        data.append(w)
+        if not directed and i != j:
+            rows.append(j)
+            cols.append(i)
+            data.append(w)
+
+    # 行归一化：M[i, j] = w(i->j) / out(i)；
+    # 预先把 M 转置为 CSR，每轮迭代计算 M.T @ x（按行聚合的 SpMV，比 x @ M 的按列散射更快，结果逐位相同）
+    adj = sp.csr_array((np.asarray(data, dtype=float), (rows, cols)), shape=(n, n))
+    out_weight = adj.sum(axis=1)
+    dangling = out_weight == 0
+    inv = np.zeros(n)
+    inv[~dangling] = 1.0 / out_weight[~dangling]
+    transition_t = sp.csr_array((sp.diags_array(inv) @ adj).T)
+
+    if nstart:
+        x = np.array([nstart.get(node, 0) for node in nodes], dtype=float)
+        x /= x.sum()
+    else:
+        x = np.repeat(1.0 / n, n)
+    # 均匀向量的每个分量都是 1/n，按标量参与运算即可（运算顺序与 networkx 相同，结果逐位一致）；
+    # 悬挂节点下标只求一次
+    inv_n = 1.0 / n
+    teleport = (1 - alpha) * inv_n
+    dangling_idx = np.flatnonzero(dangling)
+
+    if NUMBA_AVAILABLE and n >= PARALLEL_MIN_NODES and get_num_threads() > 1:
+        indptr, indices, data = transition_t.indptr, transition_t.indices, transition_t.data
+
+        def step(vec):
+            shift = vec[dangling_idx].sum() * inv_n
+            return _pagerank_step_parallel(indptr, indices, data, vec, shift, alpha, teleport)
+    else:
+        def step(vec):
+            y = transition_t @ vec
+            y += vec[dangling_idx].sum() * inv_n
+            y *= alpha
+            y += teleport
+            return y
+
+    for _ in range(max_iter):
+        xlast = x
+        x = step(xlast)
+        if np.abs(x - xlast).sum() < n * tol:
+            return dict(zip(nodes, map(float, x)))
+
+    raise nx.PowerIterationFailedConvergence(max_iter)
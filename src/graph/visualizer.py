@@ -7,13 +7,64 @@ Graph Visualizer - Stage 3
 - 使用 Pyvis 生成交互式图谱
 - 节点大小：按 PageRank 缩放
 - 边粗细：按共现次数缩放
-- 颜色：按社区检测上色
+- 颜色：按社区检测上色（固定随机种子，同一张图配色不变）
+- 生成时内嵌本地 JS，输出自包含的 HTML
 """
 import os
+import re
 import networkx as nx
+from pathlib import Path
 from pyvis.network import Network
 from typing import Dict, List, Tuple
 
+# 项目根目录（解析以 / 开头的脚本路径）
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+# Louvain 随机种子（固定后同一张图的社区划分可复现）
+COMMUNITY_SEED = 42
+
+# 匹配引用本地/远程文件的 script 标签
+_SCRIPT_SRC_RE = re.compile(r'<script\s+src=["\']([^"\']+)["\']\s*></script>')
+
+
+def inline_local_scripts(html_content: str, html_path: str) -> str:
+    """
+    将 HTML 中以相对路径引用的本地 JS 文件内嵌到 HTML 中
+    
+    Args:
+        html_content: HTML 内容
+        html_path: HTML 文件路径（用于解析相对路径）
+    
+    Returns:
+        内嵌后的 HTML 内容（CDN 链接与不存在的文件保持原样）
+    """
+    html_dir = Path(html_path).parent
+    
+    def replace_script(match):
+        script_path = match.group(1)
+        
+        # 只处理相对路径（不以 http:// 或 https:// 开头）
+        if script_path.startswith(('http://', 'https://', '//')):
+            return match.group(0)
+        
+        if script_path.startswith('/'):
+            # 绝对路径（相对于项目根目录）
+            full_path = PROJECT_ROOT / script_path.lstrip('/')
+        else:
+            # 相对路径（相对于 HTML 文件所在目录）
+            full_path = html_dir / script_path
+        
+        if not full_path.is_file():
+            return match.group(0)
+        
+        try:
+            js_content = full_path.read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError):
+            return match.group(0)
+        return '<script>\n' + js_content + '\n</script>'
+    
+    return _SCRIPT_SRC_RE.sub(replace_script, html_content)
+
 
 class GraphVisualizer:
     """图谱可视化器"""
@@ -101,8 +152,12 @@ class GraphVisualizer:
         communities = self._detect_communities()
         colors = self._generate_colors(len(set(communities.values())))
         
-        # 添加节点
-        for node in self.graph.nodes():
+        # 节点和边的数据直接写入 Pyvis 的列表（字段及顺序与 add_node/add_edge 生成的完全相同）：
+        # add_node/add_edge 每次调用都线性扫描已有节点和边做去重校验，整体是 O(N² + E²)，
+        # 而 nx.Graph 中的节点和边本身已经唯一
+        font = {"font": {"color": net.font_color}} if net.font_color else {}
+        nodes = []
+        for node, weight in self.graph.nodes(data="weight", default=0):
             # 节点大小：基于 PageRank 或度数
             if self.pagerank_scores and node in self.pagerank_scores:
                 size = max(10, self.pagerank_scores[node] * 500)  # 缩放
@@ -115,33 +170,33 @@ class GraphVisualizer:
             color = colors[community_id % len(colors)]
             
             # 节点权重（出现次数）
-            weight = self.graph.nodes[node].get("weight", 0)
-            
-            # 添加到 Pyvis
-            net.add_node(
-                node,
-                label=node,
-                size=size,
-                color=color,
-                title=f"<b>{node}</b><br>出现次数: {weight}<br>PageRank: {self.pagerank_scores.get(node, 0):.4f}" if self.pagerank_scores else f"<b>{node}</b><br>出现次数: {weight}",
-                mass=size/10  # 影响布局
-            )
-        
-        # 添加边
-        for u, v, data in self.graph.edges(data=True):
-            weight = data.get("weight", 1)
-            
-            # 边粗细：基于共现次数
-            width = max(1, weight * 0.5)
-            
-            net.add_edge(
-                u, v,
-                value=width,
-                title=f"共现次数: {weight}"
-            )
+            nodes.append({
+                "color": color,
+                "size": size,
+                "title": f"<b>{node}</b><br>出现次数: {weight}<br>PageRank: {self.pagerank_scores.get(node, 0):.4f}" if self.pagerank_scores else f"<b>{node}</b><br>出现次数: {weight}",
+                "mass": size/10,  # 影响布局
+                "id": node,
+                "label": node,
+                "shape": "dot",
+                **font
+            })
+        net.nodes = nodes
+        net.node_ids = list(self.graph.nodes)
+        net.node_map = dict(zip(net.node_ids, nodes))
         
-        # 保存
+        # 添加边（边粗细：基于共现次数）
+        net.edges = [
+            {"value": max(1, weight * 0.5), "title": f"共现次数: {weight}", "from": u, "to": v}
+            for u, v, weight in self.graph.edges(data="weight", default=1)
+        ]
+        
+        # 保存（pyvis 负责准备 lib/ 资源），再把本地 JS 内嵌进文件，
+        # 展示端直接读取即可，无需每次渲染时再做替换
         net.save_graph(output_path)
+        inlined_html = inline_local_scripts(net.html, output_path)
+        if inlined_html != net.html:
+            with open(output_path, "w", encoding="utf-8") as f:
+                f.write(inlined_html)
         
         print(f"✅ 图谱已生成: {output_path}")
         print(f"  节点数: {self.graph.number_of_nodes()}")
@@ -155,12 +210,14 @@ class GraphVisualizer:
         """
         社区检测（Louvain 算法）
         
+        固定随机种子 COMMUNITY_SEED，同一张图每次可视化得到相同的社区划分和配色
+        
         Returns:
             {node: community_id, ...}
         """
         try:
             import networkx.algorithms.community as nx_comm
-            communities = nx_comm.louvain_communities(self.graph, weight="weight")
+            communities = nx_comm.louvain_communities(self.graph, weight="weight", seed=COMMUNITY_SEED)
             
             # 转换为字典
             node_to_community = {}
@@ -217,7 +274,7 @@ def main():
     # 分析
     print("\n步骤 2: 计算 PageRank...")
     analytics = GraphAnalytics(graph)
-    pagerank_top = analytics.compute_pagerank(top_n=15)
+    pagerank_top = analytics.compute_pagerank(top_n=15, verbose=True)
     pagerank_dict = dict(pagerank_top)
     
     # 可视化
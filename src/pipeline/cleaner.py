@@ -10,10 +10,11 @@ Data Cleaner - Stage 2
 """
 import json
 import os
-import re
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, Iterator, List, Tuple
 from collections import Counter
 
+from src.utils import jsonl as fast_json
+
 
 class DataCleaner:
     """数据清洗器"""
@@ -56,25 +57,12 @@ class DataCleaner:
         os.makedirs(os.path.dirname(self.output_path), exist_ok=True)
         os.makedirs(os.path.dirname(self.report_path), exist_ok=True)
         
-        # 读取原始数据
-        raw_items = self._load_raw_data()
-        self.stats["raw_count"] = len(raw_items)
-        print(f"📥 加载原始数据: {self.stats['raw_count']} 条")
-        
-        # 清洗数据
-        clean_items = []
-        for item in raw_items:
-            clean_item, passed, reason = self._clean_item(item)
-            if passed:
-                clean_items.append(clean_item)
-            else:
-                self.stats["dropped_count"] += 1
-                self.stats["drop_reasons"][reason] += 1
-        
-        self.stats["clean_count"] = len(clean_items)
-        
-        # 保存清洗后的数据
+        # 读取 → 清洗 → 保存串成生成器流水线，逐行处理，
+        # 内存中不保留整份原始数据和清洗结果
+        raw_items = self._iter_raw_data()
+        clean_items = self._iter_clean_items(raw_items)
         self._save_clean_data(clean_items)
+        print(f"📥 原始数据: {self.stats['raw_count']} 条")
         
         # 生成报告
         self._generate_report()
@@ -89,21 +77,42 @@ class DataCleaner:
         
         return self.stats["clean_count"]
     
-    def _load_raw_data(self) -> List[Dict]:
-        """加载原始数据"""
-        items = []
+    def _iter_raw_data(self) -> Iterator[Dict]:
+        """逐条读取原始数据（跳过无效 JSON 行；文件不存在时不产出任何数据）"""
         try:
-            with open(self.input_path, "r", encoding="utf-8") as f:
+            # 按 bytes 逐行交给解析器（容忍行尾换行符），省去解码和 strip() 复制
+            with open(self.input_path, "rb") as f:
                 for line in f:
                     try:
-                        items.append(json.loads(line.strip()))
+                        item = fast_json.loads(line)
                     except json.JSONDecodeError as e:
                         print(f"⚠️  跳过无效JSON行: {e}")
+                        continue
+                    yield item
         except FileNotFoundError:
             print(f"❌ 文件不存在: {self.input_path}")
-            return []
+    
+    def _iter_clean_items(self, raw_items: Iterable[Dict]) -> Iterator[Dict]:
+        """
+        逐条清洗，只产出通过的数据
+        
+        遍历结束后写入 raw_count / clean_count / dropped_count 统计
+        """
+        raw_count = clean_count = 0
+        drop_reasons = self.stats["drop_reasons"]
+        clean_item_fn = self._clean_item
+        for item in raw_items:
+            raw_count += 1
+            clean_item, passed, reason = clean_item_fn(item)
+            if passed:
+                clean_count += 1
+                yield clean_item
+            else:
+                drop_reasons[reason] += 1
         
-        return items
+        self.stats["raw_count"] += raw_count
+        self.stats["clean_count"] += clean_count
+        self.stats["dropped_count"] += raw_count - clean_count
     
     def _clean_item(self, item: Dict) -> Tuple[Dict, bool, str]:
         """
@@ -112,11 +121,13 @@ class DataCleaner:
         Returns:
             (clean_item, passed, drop_reason)
         """
-        # 必选字段检查
-        if not item.get("title", "").strip():
+        # 必选字段检查（每个字段只取一次、只 strip 一次，结果直接用于构造输出）
+        title = item.get("title", "").strip()
+        if not title:
             return None, False, "missing_title"
         
-        if not item.get("time"):
+        time_value = item.get("time")
+        if not time_value:
             return None, False, "missing_time"
         
         # 描述长度检查（至少10个字符）
@@ -129,17 +140,19 @@ class DataCleaner:
         clean_tags = self._clean_tags(raw_tags)
         
         # 更新标签统计
-        self.stats["tag_stats"]["before_clean"] += len(raw_tags)
-        self.stats["tag_stats"]["after_clean"] += len(clean_tags)
-        self.stats["tag_stats"]["duplicates_removed"] += (len(raw_tags) - len(clean_tags))
+        num_raw, num_clean = len(raw_tags), len(clean_tags)
+        tag_stats = self.stats["tag_stats"]
+        tag_stats["before_clean"] += num_raw
+        tag_stats["after_clean"] += num_clean
+        tag_stats["duplicates_removed"] += num_raw - num_clean
         
         # 构造清洗后的数据
         clean_item = {
             "item_id": item.get("item_id", ""),
             "source": item.get("source", "xhs"),
             "url": item.get("url"),
-            "time": item.get("time"),
-            "title": item.get("title", "").strip(),
+            "time": time_value,
+            "title": title,
             "desc": desc,
             "text": item.get("text", "").strip(),
             "tags": clean_tags,
@@ -168,29 +181,36 @@ class DataCleaner:
             if not tag or not isinstance(tag, str):
                 continue
             
-            # 移除 # 和 [话题] 等标记
-            tag = re.sub(r'#', '', tag)
-            tag = re.sub(r'\[话题\]', '', tag)
-            tag = tag.strip()
+            # 移除 # 和 [话题] 等标记（固定字面量，str.replace 即可，不经过正则引擎）
+            tag = tag.replace("#", "").replace("[话题]", "").strip()
             
             # 过滤
             if not tag:
                 continue
             if len(tag) > 20:  # 过长
                 continue
-            if tag.lower() in seen:  # 去重（忽略大小写）
+            key = tag.lower()
+            if key in seen:  # 去重（忽略大小写）
                 continue
             
             cleaned.append(tag)
-            seen.add(tag.lower())
+            seen.add(key)
         
         return cleaned
     
-    def _save_clean_data(self, items: List[Dict]):
-        """保存清洗后的数据"""
-        with open(self.output_path, "w", encoding="utf-8") as f:
-            for item in items:
-                f.write(json.dumps(item, ensure_ascii=False) + "\n")
+    def _save_clean_data(self, items: Iterable[Dict]):
+        """保存清洗后的数据（items 可以是边读边清洗的生成器）"""
+        # 每行直接序列化为带换行的 UTF-8 bytes，由文件缓冲区合并写入；
+        # 先写临时文件，全部成功后再替换，清洗中途出错不会留下半个输出文件
+        tmp_path = f"{self.output_path}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.writelines(fast_json.dumps(item, newline=True) for item in items)
+            os.replace(tmp_path, self.output_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
         
         print(f"💾 清洗数据已保存: {self.output_path}")
     
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+JSON Utilities
+JSON 编解码：优先使用 orjson，未安装时退回标准库 json
+
+功能：
+- loads: 解析 str / bytes
+- dumps: 序列化为 UTF-8 bytes（等价于 ensure_ascii=False），可直接带行尾换行写 JSONL
+"""
+import json
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+
+def loads(data):
+    """
+    解析 JSON
+
+    Args:
+        data: str 或 bytes（允许带行尾换行符）
+
+    Returns:
+        解析后的对象
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj, indent: bool = False, newline: bool = False, sort_keys: bool = False) -> bytes:
+    """
+    序列化为 UTF-8 bytes
+
+    Args:
+        obj: 待序列化对象
+        indent: 是否缩进 2 空格
+        newline: 是否追加行尾换行符（orjson 在序列化时直接写入，不再额外拼接一次 bytes）
+        sort_keys: 是否按键排序（用于生成与键顺序无关的规范化输出）
+
+    Returns:
+        JSON bytes
+    """
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if newline:
+            option |= orjson.OPT_APPEND_NEWLINE
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, option=option)
+    text = json.dumps(obj, ensure_ascii=False, indent=2 if indent else None, sort_keys=sort_keys)
+    return (text + "\n" if newline else text).encode("utf-8")
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""
+Line Counting Utilities
+按块统计文本文件行数
+
+功能：
+- count_lines: 按 1 MiB 分块统计换行符，无需把整个文件读入内存或逐行解码
+"""
+
+# 每次读入的块大小
+_CHUNK_SIZE = 1 << 20
+
+
+def count_lines(path) -> int:
+    """
+    统计文件行数（末行没有换行符时也算一行）
+
+    Args:
+        path: 文件路径
+
+    Returns:
+        行数（空文件为 0）
+
+    Raises:
+        OSError: 文件不存在或无法读取（由调用方决定如何处理）
+    """
+    lines = 0
+    last = 0x0A
+    # 复用同一块缓冲区读入，避免每块都分配新的 bytes
+    buf = bytearray(_CHUNK_SIZE)
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            lines += buf.count(b"\n", 0, n)
+            last = buf[n - 1]
+    if last != 0x0A:
+        lines += 1
+    return lines
@@ -11,13 +11,57 @@ Packaging Utilities
 import os
 import zipfile
 import json
-from datetime import datetime
+import hashlib
+import time
+from collections import defaultdict
+from functools import lru_cache
 from typing import List, Tuple
 
+from src.utils import jsonl as fast_json
+
+# 近似去重（MinHash-LSH）可选依赖
+try:
+    from datasketch import MinHash, MinHashLSH
+    DATASKETCH_AVAILABLE = True
+except ImportError:
+    DATASKETCH_AVAILABLE = False
+
+# DEFLATE 压缩级别：源码 / JSONL / HTML 这类文本用 1 级只比默认 6 级略大，压缩耗时明显更少；
+# 不用 ZIP_ZSTANDARD（需 Python 3.14+，且常见解压工具尚不支持）
+ZIP_COMPRESSLEVEL = 1
+
+# 顺序读写大 JSONL 时的文件缓冲区大小（默认 8 KiB 会产生大量小块 read/write 系统调用）
+IO_BUFFER_SIZE = 1 << 20
+
+# 近似去重参数：按 5 字符切片，128 个置换，估计 Jaccard 相似度 >= 0.8 视为重复
+SHINGLE_SIZE = 5
+MINHASH_NUM_PERM = 128
+NEAR_DUP_THRESHOLD = 0.8
+
+# 提交包文件清单：(相对项目根目录的源路径, ZIP 内路径)
+FILES_TO_PACK = (
+    # 1. 数据文件
+    ("data/raw/annotations.jsonl", "data/raw/annotations.jsonl"),
+    ("data/clean/annotations_clean.jsonl", "data/clean/annotations_clean.jsonl"),
+    ("data/stats/cleaning_report.json", "data/stats/cleaning_report.json"),
+    ("data/output/graph.html", "data/output/graph.html"),
+    # 2. 文档
+    ("README_USAGE.md", "docs/README_USAGE.md"),
+    ("QUICK_START.md", "docs/QUICK_START.md"),
+    # 3. 源代码（关键文件）
+    ("src/crawler/xhs_adapter.py", "src/crawler/xhs_adapter.py"),
+    ("src/pipeline/cleaner.py", "src/pipeline/cleaner.py"),
+    ("src/graph/builder.py", "src/graph/builder.py"),
+    ("src/graph/analytics.py", "src/graph/analytics.py"),
+    ("src/graph/visualizer.py", "src/graph/visualizer.py"),
+    ("src/app/dashboard.py", "src/app/dashboard.py"),
+)
+
 
 def create_submission_package(
     output_dir: str = "data/exports",
-    project_root: str = "."
+    project_root: str = ".",
+    files: Tuple[Tuple[str, str], ...] = FILES_TO_PACK
 ) -> Tuple[str, dict]:
     """
     创建提交包 ZIP
@@ -25,11 +69,12 @@ def create_submission_package(
     Args:
         output_dir: 输出目录
         project_root: 项目根目录
+        files: 待打包文件 (相对 project_root 的源路径, ZIP 内路径)，默认 FILES_TO_PACK
         
     Returns:
         (zip_path, stats)
     """
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
     zip_name = f"submission_{timestamp}.zip"
     zip_path = os.path.join(output_dir, zip_name)
     
@@ -47,55 +92,37 @@ def create_submission_package(
     print("📦 开始创建提交包")
     print("=" * 60)
     
-    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zf:
-        # 1. 数据文件
-        files_to_pack = [
-            ("data/raw/annotations.jsonl", "data/raw/annotations.jsonl"),
-            ("data/clean/annotations_clean.jsonl", "data/clean/annotations_clean.jsonl"),
-            ("data/stats/cleaning_report.json", "data/stats/cleaning_report.json"),
-            ("data/output/graph.html", "data/output/graph.html"),
-        ]
-        
-        # 2. 文档
-        docs = [
-            ("README_USAGE.md", "docs/README_USAGE.md"),
-            ("QUICK_START.md", "docs/QUICK_START.md"),
-        ]
-        files_to_pack.extend(docs)
-        
-        # 3. 源代码（关键文件）
-        code_files = [
-            ("src/crawler/xhs_adapter.py", "src/crawler/xhs_adapter.py"),
-            ("src/pipeline/cleaner.py", "src/pipeline/cleaner.py"),
-            ("src/graph/builder.py", "src/graph/builder.py"),
-            ("src/graph/analytics.py", "src/graph/analytics.py"),
-            ("src/graph/visualizer.py", "src/graph/visualizer.py"),
-            ("src/app/dashboard.py", "src/app/dashboard.py"),
-        ]
-        files_to_pack.extend(code_files)
-        
-        # 打包文件
-        for src, dst in files_to_pack:
+    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=ZIP_COMPRESSLEVEL) as zf:
+        # 1-3. 数据文件、文档、源代码（清单见 FILES_TO_PACK）
+        # 打包文件（每个文件只 stat 一次：同时判断是否存在并取大小，总字节数最后再换算 MB）
+        # 逐文件进度先收集起来，打包结束后一次性输出
+        progress = []
+        total_bytes = 0
+        for src, dst in files:
             src_path = os.path.join(project_root, src)
-            if os.path.exists(src_path):
-                zf.write(src_path, dst)
-                size = os.path.getsize(src_path)
-                stats["files_included"].append(dst)
-                stats["total_size_mb"] += size / 1024 / 1024
-                print(f"  ✓ {dst}")
-            else:
-                print(f"  ⚠ 跳过（不存在）: {src}")
+            try:
+                size = os.stat(src_path).st_size
+            except FileNotFoundError:
+                progress.append(f"  ⚠ 跳过（不存在）: {src}")
+                continue
+            zf.write(src_path, dst)
+            stats["files_included"].append(dst)
+            total_bytes += size
+            progress.append(f"  ✓ {dst}")
+        stats["total_size_mb"] = total_bytes / (1024 * 1024)
         
         # 4. 生成 DELIVERY.md
         delivery_content = generate_delivery_readme(stats)
         zf.writestr("DELIVERY.md", delivery_content)
-        print(f"  ✓ DELIVERY.md (自动生成)")
+        progress.append("  ✓ DELIVERY.md (自动生成)")
         
         # 5. 打包日志（如果存在）
-        if os.path.exists(os.path.join(project_root, "logs/app.log")):
-            zf.write("logs/app.log", "logs/app.log")
-            print(f"  ✓ logs/app.log")
+        log_path = os.path.join(project_root, "logs/app.log")
+        if os.path.exists(log_path):
+            zf.write(log_path, "logs/app.log")
+            progress.append("  ✓ logs/app.log")
     
+    print("\n".join(progress))
     print("=" * 60)
     print(f"✅ 提交包已生成")
     print(f"  文件: {zip_path}")
@@ -106,23 +133,21 @@ def create_submission_package(
     return zip_path, stats
 
 
-def generate_delivery_readme(stats: dict) -> str:
-    """
-    生成 DELIVERY.md 交付说明文档
-    
-    Args:
-        stats: 打包统计信息
-        
-    Returns:
-        str: Markdown 内容
-    """
-    content = f"""# 提交包说明文档
+@lru_cache(maxsize=4)
+def _load_report(path, mtime_ns, size):
+    """解析清洗报告 JSON，结果按 (路径, 修改时间, 大小) 缓存（只读，调用方不要修改）"""
+    with open(path, "rb") as f:
+        return fast_json.loads(f.read())
+
+
+# DELIVERY.md 模板（模块加载时构造一次，生成时用 format_map 一次填充全部字段）
+DELIVERY_TEMPLATE = """# 提交包说明文档
 
 ## 📦 提交信息
 
-- **生成时间**: {stats.get('timestamp', 'N/A')}
-- **包含文件**: {len(stats.get('files_included', []))} 个
-- **总大小**: {stats.get('total_size_mb', 0):.2f} MB
+- **生成时间**: {timestamp}
+- **包含文件**: {n_files} 个
+- **总大小**: {total_size_mb:.2f} MB
 
 ---
 
@@ -235,25 +260,61 @@ streamlit run src/app/dashboard.py
 
 **🎓 AI Tools 数据挖掘工作站 | Stage 1-4 Complete**
 
-生成时间: {stats.get('timestamp', 'N/A')}
+生成时间: {timestamp}
 """
+
+
+def generate_delivery_readme(stats: dict) -> str:
+    """
+    生成 DELIVERY.md 交付说明文档
+    
+    Args:
+        stats: 打包统计信息
+        
+    Returns:
+        str: Markdown 内容
+    """
+    # 缺失的字段显示为 N/A
+    fields = defaultdict(
+        lambda: "N/A",
+        timestamp=stats.get("timestamp", "N/A"),
+        n_files=len(stats.get("files_included", [])),
+        total_size_mb=stats.get("total_size_mb", 0)
+    )
     
-    # 如果有清洗报告，插入真实数据
+    # 如果有清洗报告，填入真实数据
     try:
-        with open("data/stats/cleaning_report.json", "r", encoding="utf-8") as f:
-            report = json.load(f)
-            content = content.replace("{raw_count}", str(report.get("raw_count", "N/A")))
-            content = content.replace("{clean_count}", str(report.get("clean_count", "N/A")))
-            content = content.replace("{pass_rate}", str(report.get("pass_rate", "N/A")))
-    except:
+        report_path = "data/stats/cleaning_report.json"
+        stat = os.stat(report_path)
+        report = _load_report(report_path, stat.st_mtime_ns, stat.st_size)
+        if isinstance(report, dict):
+            fields.update(
+                raw_count=report.get("raw_count", "N/A"),
+                clean_count=report.get("clean_count", "N/A"),
+                pass_rate=report.get("pass_rate", "N/A")
+            )
+    except (OSError, ValueError):
+        # 报告不存在 / 不可读 / 不是合法 UTF-8 JSON 时保留 N/A（JSONDecodeError、UnicodeDecodeError 都是 ValueError）
         pass
     
-    return content
+    return DELIVERY_TEMPLATE.format_map(fields)
+
+
+def _dedup_key(item: dict):
+    """
+    去重键：优先使用 item_id；缺少 item_id 时用按键排序序列化后内容的 SHA-256（取前 16 字节）
+    
+    item_id 是 str、内容哈希是 bytes，两类键不会互相冲突
+    """
+    item_id = item.get("item_id")
+    if item_id:
+        return item_id
+    return hashlib.sha256(fast_json.dumps(item, sort_keys=True)).digest()[:16]
 
 
 def deduplicate_jsonl(items: List[dict]) -> List[dict]:
     """
-    基于 item_id 去重
+    基于 item_id 去重（缺少 item_id 的数据按内容去重，不再直接丢弃）
     
     Args:
         items: JSON 对象列表
@@ -261,49 +322,95 @@ def deduplicate_jsonl(items: List[dict]) -> List[dict]:
     Returns:
         去重后的列表
     """
-    seen_ids = set()
-    unique_items = []
+    # 单个 dict 同时承担去重集合和有序结果（首条保留，顺序为首次出现顺序）
+    unique_items = {}
     
     for item in items:
-        item_id = item.get("item_id")
-        if item_id and item_id not in seen_ids:
-            unique_items.append(item)
-            seen_ids.add(item_id)
+        key = _dedup_key(item)
+        if key not in unique_items:
+            unique_items[key] = item
     
-    return unique_items
+    return list(unique_items.values())
 
 
-def merge_jsonl_files(file_paths: List[str], output_path: str) -> int:
+def _minhash(item: dict):
+    """
+    计算笔记文本的 MinHash 签名
+    
+    文本优先取 text 字段，没有时拼接 title + desc；
+    短于一个切片的文本返回 None（只做精确去重）
+    """
+    text = item.get("text") or f"{item.get('title', '')}{item.get('desc', '')}"
+    if not isinstance(text, str) or len(text) < SHINGLE_SIZE:
+        return None
+    shingles = {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+    mh = MinHash(num_perm=MINHASH_NUM_PERM)
+    mh.update_batch([shingle.encode("utf-8") for shingle in shingles])
+    return mh
+
+
+def merge_jsonl_files(file_paths: List[str], output_path: str, dedup_mode: str = "exact") -> int:
     """
     合并多个 JSONL 文件并去重
     
+    流式处理：逐行读取，只记住已出现的去重键，新键的原始行直接写出（不重新序列化），
+    内存占用与唯一键数成正比而不是与总数据量成正比。去重规则与 deduplicate_jsonl 相同
+    （首条保留，缺少 item_id 的行按内容哈希去重）
+    
+    dedup_mode="near" 时在精确去重之后再做一轮 MinHash-LSH 近似去重：
+    与已保留笔记文本相似度超过 NEAR_DUP_THRESHOLD 的行视为改写/转载，直接跳过
+    （需要 datasketch，未安装时退回精确去重）
+    
     Args:
         file_paths: 输入文件路径列表
-        output_path: 输出文件路径
+        output_path: 输出文件路径（可以是输入文件之一：先写临时文件，完成后再替换）
+        dedup_mode: "exact"（按 item_id / 内容哈希）或 "near"（额外做近似去重）
         
     Returns:
         合并后的数据条数
     """
-    all_items = []
+    if dedup_mode not in ("exact", "near"):
+        raise ValueError(f"未知的去重模式: {dedup_mode}")
     
-    for path in file_paths:
-        if not os.path.exists(path):
-            continue
-        
-        with open(path, "r", encoding="utf-8") as f:
-            for line in f:
-                try:
-                    all_items.append(json.loads(line.strip()))
-                except json.JSONDecodeError:
-                    continue
+    lsh = None
+    if dedup_mode == "near":
+        if DATASKETCH_AVAILABLE:
+            lsh = MinHashLSH(threshold=NEAR_DUP_THRESHOLD, num_perm=MINHASH_NUM_PERM)
+        else:
+            print("⚠️  未安装 datasketch，近似去重不可用，退回精确去重")
     
-    # 去重
-    unique_items = deduplicate_jsonl(all_items)
+    seen_ids = set()
     
-    # 保存
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    with open(output_path, "w", encoding="utf-8") as f:
-        for item in unique_items:
-            f.write(json.dumps(item, ensure_ascii=False) + "\n")
+    tmp_path = f"{output_path}.tmp"
+    try:
+        with open(tmp_path, "wb", buffering=IO_BUFFER_SIZE) as out:
+            for path in file_paths:
+                if not os.path.exists(path):
+                    continue
+                
+                with open(path, "rb", buffering=IO_BUFFER_SIZE) as f:
+                    for line in f:
+                        try:
+                            item = fast_json.loads(line)
+                        except json.JSONDecodeError:
+                            continue
+                        key = _dedup_key(item)
+                        if key in seen_ids:
+                            continue
+                        if lsh is not None:
+                            mh = _minhash(item)
+                            if mh is not None:
+                                # 先查询再插入：与已保留的任一笔记近似即跳过（首条保留）
+                                if lsh.query(mh):
+                                    continue
+                                lsh.insert(key, mh)
+                        seen_ids.add(key)
+                        out.write(line if line.endswith(b"\n") else line + b"\n")
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
     
-    return len(unique_items)
+    return len(seen_ids)
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""
+Top-K Utilities
+基于 NumPy 的 Top K 选择
+
+功能：
+- top_k_indices: 按分数降序取前 k 个下标，同分按原下标升序（与稳定排序结果一致）
+"""
+import numpy as np
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    按分数降序取前 k 个下标（同分保持原顺序）
+
+    先用 np.partition 求出第 k 大的分数作为门槛（O(n)），
+    再只对不低于门槛的候选排序；门槛处的并列分数全部进入候选，
+    因此结果与对全体做稳定排序后取前 k 个完全一致。
+
+    Args:
+        scores: 一维分数数组
+        k: 返回数量
+
+    Returns:
+        下标数组（长度 min(k, len(scores))）
+    """
+    n = len(scores)
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+
+    neg = -scores
+    if k < n:
+        threshold = np.partition(neg, k - 1)[k - 1]
+        candidates = np.flatnonzero(neg <= threshold)
+    else:
+        candidates = np.arange(n)
+    # 先按分数降序、再按原下标升序
+    order = np.lexsort((candidates, neg[candidates]))
+    return candidates[order[:k]]
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the queued JSONL writer in the XHS crawler adapter
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+xhs_adapter = pytest.importorskip("src.crawler.xhs_adapter")
+JsonlStoreImplement = xhs_adapter.JsonlStoreImplement
+
+
+def _note(note_id):
+    return {"note_id": note_id, "title": f"title {note_id}", "desc": "desc"}
+
+
+def _lines(path):
+    return path.read_bytes().splitlines() if path.exists() else []
+
+
+@pytest.fixture
+def store(tmp_path):
+    JsonlStoreImplement.reset()
+    yield JsonlStoreImplement(output_path=str(tmp_path / "annotations.jsonl"))
+    JsonlStoreImplement.reset()
+
+
+class TestJsonlStoreImplement:
+    """Test cases for JsonlStoreImplement dedup and background writes"""
+
+    def test_dedup_holds_while_put_waits(self, store, tmp_path, monkeypatch):
+        """Concurrent stores of one note_id write a single line while put is blocked on a full queue"""
+        monkeypatch.setattr(JsonlStoreImplement, "QUEUE_MAXSIZE", 1)
+        release = threading.Event()
+        write_lines = JsonlStoreImplement._write_lines
+
+        def gated(cls, path, lines):
+            release.wait(5)
+            write_lines(path, lines)
+
+        monkeypatch.setattr(JsonlStoreImplement, "_write_lines", classmethod(gated))
+
+        async def scenario():
+            # The writer takes "a" and blocks on disk, "b" fills the queue, every later put waits
+            await store.store_content(_note("a"))
+            await asyncio.sleep(0)
+            await store.store_content(_note("b"))
+            tasks = [asyncio.create_task(store.store_content(_note("same"))) for _ in range(5)]
+            await asyncio.sleep(0)
+            release.set()
+            await asyncio.gather(*tasks)
+            await JsonlStoreImplement.drain()
+
+        asyncio.run(scenario())
+        assert len(_lines(tmp_path / "annotations.jsonl")) == 3
+        assert JsonlStoreImplement.get_total_count() == 3
+
+    def test_failed_write_is_not_counted(self, store, tmp_path, monkeypatch):
+        """A batch that fails to write is not counted and can be stored again later"""
+        def fail(cls, path, lines):
+            raise OSError("disk full")
+
+        async def store_and_drain():
+            await store.store_content(_note("n1"))
+            await JsonlStoreImplement.drain()
+
+        with monkeypatch.context() as patch:
+            patch.setattr(JsonlStoreImplement, "_write_lines", classmethod(fail))
+            asyncio.run(store_and_drain())
+        assert JsonlStoreImplement.get_total_count() == 0
+
+        asyncio.run(store_and_drain())
+        assert JsonlStoreImplement.get_total_count() == 1
+        assert len(_lines(tmp_path / "annotations.jsonl")) == 1
+
+
+class _FakeCrawler:
+    """Stores config.CRAWLER_MAX_NOTES_COUNT notes prefixed by the keyword through the injected store"""
+
+    async def start(self):
+        config = xhs_adapter.config
+        store = xhs_adapter.XhsStoreFactory.STORES[config.SAVE_DATA_OPTION]()
+        for i in range(config.CRAWLER_MAX_NOTES_COUNT):
+            await store.store_content(_note(f"{config.KEYWORDS}-{i}"))
+            await asyncio.sleep(0)
+
+
+class TestXhsBasicCrawlerRun:
+    """Test cases for XhsBasicCrawler.run bookkeeping"""
+
+    def test_concurrent_runs_count_only_their_own_notes(self, tmp_path, monkeypatch):
+        """Two runs under gather report their own counts and the shorter one does not stop the writer"""
+        JsonlStoreImplement.reset()
+        monkeypatch.setattr(xhs_adapter, "XiaoHongShuCrawler", _FakeCrawler)
+        short = xhs_adapter.XhsBasicCrawler(keyword="short", max_notes=3, append_mode=True)
+        long_run = xhs_adapter.XhsBasicCrawler(keyword="long", max_notes=50, append_mode=True)
+        for crawler in (short, long_run):
+            crawler.output_path = str(tmp_path / "annotations.jsonl")
+
+        async def scenario():
+            return await asyncio.gather(short.run(), long_run.run())
+
+        try:
+            assert asyncio.run(scenario()) == [3, 50]
+            assert len(_lines(tmp_path / "annotations.jsonl")) == 53
+        finally:
+            JsonlStoreImplement.reset()
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for vectorized tag co-occurrence counting
+"""
+
+from collections import Counter
+from itertools import chain, combinations
+
+import numpy as np
+import pytest
+
+from src.graph import builder
+from src.graph.builder import TagCooccurrenceGraph, count_cooccurrences
+
+
+def _random_rows(seed=5):
+    rng = np.random.default_rng(seed)
+    return [sorted(rng.integers(0, 12, size=rng.integers(0, 7)).tolist()) for _ in range(200)]
+
+
+def _as_arrays(rows):
+    flat = np.fromiter(chain.from_iterable(rows), dtype=np.int64)
+    lengths = np.fromiter(map(len, rows), dtype=np.int64, count=len(rows))
+    return flat, lengths
+
+
+def _counter_reference(rows):
+    counter = Counter()
+    for row in rows:
+        for pair in combinations(row, 2):
+            counter[pair] += 1
+    return [(u, v, count) for (u, v), count in counter.items()]
+
+
+class TestCountCooccurrences:
+    """Test cases for count_cooccurrences"""
+
+    def test_matches_counter_in_insertion_order(self):
+        """Counts and first-seen order match a per-row Counter, including self-pairs"""
+        rows = _random_rows()
+        u, v, counts = count_cooccurrences(*_as_arrays(rows))
+        assert list(zip(u.tolist(), v.tolist(), counts.tolist())) == _counter_reference(rows)
+
+    def test_no_pairs(self):
+        """Rows with fewer than two tags yield no pairs"""
+        u, v, counts = count_cooccurrences(*_as_arrays([[], [3]]))
+        assert u.size == v.size == counts.size == 0
+
+    def test_numba_keys_match_numpy(self):
+        """The compiled pair enumeration gives the same keys as the NumPy buckets"""
+        pytest.importorskip("numba")
+        flat, lengths = _as_arrays(_random_rows())
+        offsets = np.concatenate(([0], np.cumsum(lengths)))
+        expected = builder._pair_keys_numpy(flat, lengths)
+        assert np.array_equal(builder._pair_keys_numba(flat, offsets), expected)
+
+
+class TestTagCooccurrenceGraph:
+    """Test cases for the array-backed graph queries"""
+
+    def _built(self, capsys):
+        rng = np.random.default_rng(11)
+        graph_builder = TagCooccurrenceGraph()
+        graph_builder.items = [
+            {"tags": [f"t{i}" for i in rng.integers(0, 15, size=rng.integers(0, 6))]}
+            for _ in range(150)
+        ]
+        graph_builder.build_graph()
+        capsys.readouterr()
+        return graph_builder
+
+    def test_top_nodes_and_edges_match_graph(self, capsys):
+        """Top-N from the arrays matches a stable sort over the NetworkX graph"""
+        graph_builder = self._built(capsys)
+        graph = graph_builder.graph
+        nodes = sorted(graph.nodes(data="weight"), key=lambda x: x[1], reverse=True)
+        edges = sorted(graph.edges(data="weight"), key=lambda x: x[2], reverse=True)
+        assert graph_builder.get_top_nodes(5) == nodes[:5]
+        assert graph_builder.get_top_edges(len(edges)) == edges
+
+    def test_stats_match_networkx(self, capsys):
+        """Components, average degree and density agree with NetworkX (self-loops included)"""
+        nx = pytest.importorskip("networkx")
+        graph_builder = self._built(capsys)
+        graph = graph_builder.graph
+        stats = graph_builder.get_graph_stats()
+        assert stats["num_components"] == nx.number_connected_components(graph)
+        assert stats["avg_degree"] == sum(d for _, d in graph.degree()) / graph.number_of_nodes()
+        assert stats["density"] == nx.density(graph)
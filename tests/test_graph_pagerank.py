@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the sparse PageRank implementation
+"""
+
+import pytest
+
+nx = pytest.importorskip("networkx")
+pytest.importorskip("scipy")
+
+from src.graph import pagerank
+from src.graph.pagerank import fast_pagerank
+
+
+def _weighted_graph():
+    graph = nx.gnm_random_graph(200, 600, seed=7)
+    for i, (u, v) in enumerate(graph.edges()):
+        graph[u][v]["weight"] = i % 5 + 1
+    graph.add_node("isolated")
+    return graph
+
+
+class TestFastPagerank:
+    """Test cases for fast_pagerank"""
+
+    def test_matches_networkx(self):
+        """Scores match networkx.pagerank on a weighted graph with a dangling node"""
+        graph = _weighted_graph()
+        expected = nx.pagerank(graph, weight="weight")
+        actual = fast_pagerank(graph, weight="weight")
+        assert actual.keys() == expected.keys()
+        for node, score in expected.items():
+            assert actual[node] == pytest.approx(score, abs=1e-12)
+
+    def test_warm_start_converges_to_same_scores(self):
+        """A warm start from previous scores reaches the same fixed point"""
+        graph = _weighted_graph()
+        previous = fast_pagerank(graph)
+        graph.add_edge(0, "new_tag", weight=3)
+        cold = fast_pagerank(graph)
+        warm = fast_pagerank(graph, nstart=previous)
+        for node, score in cold.items():
+            assert warm[node] == pytest.approx(score, abs=1e-4)
+
+    def test_empty_graph(self):
+        """Empty graph yields no scores"""
+        assert fast_pagerank(nx.Graph()) == {}
+
+    def test_parallel_matvec_matches_scipy(self, monkeypatch):
+        """The Numba row-partitioned SpMV gives the same scores as SciPy"""
+        pytest.importorskip("numba")
+        graph = _weighted_graph()
+        expected = fast_pagerank(graph)
+        monkeypatch.setattr(pagerank, "PARALLEL_MIN_NODES", 0)
+        monkeypatch.setattr(pagerank, "get_num_threads", lambda: 2)
+        assert fast_pagerank(graph) == expected
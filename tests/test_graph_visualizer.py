@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for community detection in the graph visualizer
+"""
+
+import pytest
+
+nx = pytest.importorskip("networkx")
+pytest.importorskip("pyvis")
+
+from src.graph.visualizer import GraphVisualizer
+
+
+def _graph():
+    graph = nx.karate_club_graph()
+    for u, v in graph.edges():
+        graph[u][v]["weight"] = (u + v) % 3 + 1
+    return nx.relabel_nodes(graph, {i: f"tag{i}" for i in graph})
+
+
+class TestDetectCommunities:
+    """Test cases for GraphVisualizer._detect_communities"""
+
+    def test_seeded_result_is_reproducible(self):
+        """The same graph gets the same community assignment on every run"""
+        first = GraphVisualizer(_graph())._detect_communities()
+        assert set(first) == set(_graph().nodes)
+        assert all(GraphVisualizer(_graph())._detect_communities() == first for _ in range(5))
+
+    def test_failure_falls_back_to_single_community(self, monkeypatch):
+        """If Louvain raises, every node lands in community 0"""
+        def fail(*args, **kwargs):
+            raise RuntimeError("louvain failed")
+
+        monkeypatch.setattr(nx.algorithms.community, "louvain_communities", fail)
+        assert set(GraphVisualizer(_graph())._detect_communities().values()) == {0}
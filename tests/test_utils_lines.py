@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for chunked line counting
+"""
+
+import pytest
+
+from src.utils import lines
+from src.utils.lines import count_lines
+
+
+class TestCountLines:
+    """Test cases for count_lines"""
+
+    @pytest.mark.parametrize("content, expected", [
+        (b"", 0),
+        (b"a\n", 1),
+        (b"a\nb", 2),
+        (b"a\n\nb\n", 3),
+    ])
+    def test_counts_match_splitlines(self, tmp_path, content, expected):
+        """An unterminated last line counts; an empty file has no lines"""
+        path = tmp_path / "data.jsonl"
+        path.write_bytes(content)
+        assert count_lines(path) == expected == len(content.splitlines())
+
+    def test_counts_across_chunk_boundaries(self, tmp_path, monkeypatch):
+        """Newlines split across reads are each counted once"""
+        monkeypatch.setattr(lines, "_CHUNK_SIZE", 3)
+        path = tmp_path / "data.jsonl"
+        path.write_bytes(b"ab\ncd\n\nefg")
+        assert count_lines(path) == 4
+
+    def test_missing_file_raises(self, tmp_path):
+        """Callers decide how to handle a missing file"""
+        with pytest.raises(FileNotFoundError):
+            count_lines(tmp_path / "missing.jsonl")
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for JSONL deduplication and merging in the packaging utilities
+"""
+
+import json
+
+import pytest
+
+from src.utils.packaging import deduplicate_jsonl, generate_delivery_readme, merge_jsonl_files
+
+
+def _write_jsonl(path, rows):
+    path.write_text("".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows), encoding="utf-8")
+
+
+class TestDeduplicateJsonl:
+    """Test cases for deduplicate_jsonl"""
+
+    def test_first_item_id_wins(self):
+        """Duplicates by item_id keep the first occurrence in first-seen order"""
+        items = [{"item_id": "a", "v": 1}, {"item_id": "b"}, {"item_id": "a", "v": 2}]
+        assert deduplicate_jsonl(items) == [{"item_id": "a", "v": 1}, {"item_id": "b"}]
+
+    def test_rows_without_item_id_dedup_by_content(self):
+        """Rows lacking item_id are kept and deduplicated regardless of key order"""
+        items = [{"title": "x", "desc": "y"}, {"desc": "y", "title": "x"}, {"title": "z"}, {"item_id": ""}]
+        assert deduplicate_jsonl(items) == [{"title": "x", "desc": "y"}, {"title": "z"}, {"item_id": ""}]
+
+
+class TestMergeJsonlFiles:
+    """Test cases for merge_jsonl_files"""
+
+    def test_merge_into_input_file(self, tmp_path):
+        """Merging into one of the inputs keeps raw lines and applies the same dedup rule"""
+        first, second = tmp_path / "a.jsonl", tmp_path / "b.jsonl"
+        _write_jsonl(first, [{"item_id": "1"}, {"title": "no id"}])
+        _write_jsonl(second, [{"item_id": "1", "v": 2}, {"item_id": "2"}, {"title": "no id"}])
+
+        count = merge_jsonl_files([str(first), str(second), str(tmp_path / "missing.jsonl")], str(first))
+
+        rows = [json.loads(line) for line in first.read_text(encoding="utf-8").splitlines()]
+        assert count == 3
+        assert rows == [{"item_id": "1"}, {"title": "no id"}, {"item_id": "2"}]
+        assert not (tmp_path / "a.jsonl.tmp").exists()
+
+    def test_near_mode_skips_paraphrased_notes(self, tmp_path):
+        """Near mode drops a lightly edited copy that exact mode keeps"""
+        pytest.importorskip("datasketch")
+        text = "今天分享一个超好用的AI写作工具，可以自动生成小红书文案，还能一键改写标题，效率提升很多"
+        source = tmp_path / "a.jsonl"
+        _write_jsonl(source, [
+            {"item_id": "1", "text": text},
+            {"item_id": "2", "text": text + "！"},
+            {"item_id": "3", "text": "完全不同的一篇笔记，讲的是周末去哪里露营以及需要准备哪些装备"},
+        ])
+
+        assert merge_jsonl_files([str(source)], str(tmp_path / "exact.jsonl")) == 3
+        assert merge_jsonl_files([str(source)], str(tmp_path / "near.jsonl"), dedup_mode="near") == 2
+        rows = [json.loads(line) for line in (tmp_path / "near.jsonl").read_text(encoding="utf-8").splitlines()]
+        assert [row["item_id"] for row in rows] == ["1", "3"]
+
+
+class TestGenerateDeliveryReadme:
+    """Test cases for generate_delivery_readme"""
+
+    @pytest.mark.parametrize("content", [b"[1]", b"{bad", b"\xff\xfe{}"])
+    def test_unusable_report_falls_back_to_na(self, tmp_path, monkeypatch, content):
+        """A report that is not a UTF-8 JSON object leaves the counts as N/A"""
+        report = tmp_path / "data" / "stats" / "cleaning_report.json"
+        report.parent.mkdir(parents=True)
+        report.write_bytes(content)
+        monkeypatch.chdir(tmp_path)
+
+        readme = generate_delivery_readme({"timestamp": "t", "files_included": [], "total_size_mb": 0})
+        assert "**原始数据**: N/A 条" in readme
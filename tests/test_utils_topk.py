@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for NumPy top-k selection
+"""
+
+import numpy as np
+
+from src.utils.topk import top_k_indices
+
+
+def _stable_reference(scores, k):
+    return sorted(range(len(scores)), key=lambda i: -scores[i])[:k]
+
+
+class TestTopKIndices:
+    """Test cases for top_k_indices"""
+
+    def test_matches_stable_sort_with_ties(self):
+        """Ties at the cut-off keep the lowest original indices"""
+        rng = np.random.default_rng(3)
+        for _ in range(50):
+            scores = rng.integers(0, 5, size=40).astype(float)
+            for k in (1, 3, 10, 40):
+                assert top_k_indices(scores, k).tolist() == _stable_reference(scores, k)
+
+    def test_k_larger_than_input(self):
+        """Asking for more than available returns everything in order"""
+        scores = np.array([0.1, 0.3, 0.2])
+        assert top_k_indices(scores, 10).tolist() == [1, 2, 0]
+
+    def test_empty(self):
+        """Empty input or k=0 yields no indices"""
+        assert top_k_indices(np.array([]), 3).size == 0
+        assert top_k_indices(np.array([1.0]), 0).size == 0